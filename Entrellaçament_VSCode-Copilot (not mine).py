@@ -1,118 +1,16 @@
 import numpy as np
-import matplotlib.pyplot as plt
-import random
-from matplotlib.patches import Rectangle
-from matplotlib.widgets import TextBox, Button
-
-def normalizar_estado(estado):
-    """Normalitza l'estat quàntic"""
-    norma = np.sqrt(np.sum(np.abs(estado)**2))
-    return estado / norma
-
-def probabilidad_medida(estado, base):
-    """Calcula la probabilitat de cada resultat de mesura en una base donada"""
-    if base == 'z':
-        # Mesura en base z: |0⟩ i |1⟩
-        p0 = np.abs(estado[0])**2 + np.abs(estado[1])**2
-        p1 = np.abs(estado[2])**2 + np.abs(estado[3])**2
-        return p0, p1
-    else:
-        # Mesura en base rotada (angle alpha)
-        alpha = base
-        # Probabilitat de +1 en el segon qubit
-        p_plus = (np.abs(estado[0]*np.cos(alpha/2) + estado[1]*np.sin(alpha/2))**2 +
-                 np.abs(estado[2]*np.cos(alpha/2) + estado[3]*np.sin(alpha/2))**2)
-        # Probabilitat de -1 en el segon qubit
-        p_minus = (np.abs(estado[0]*np.sin(alpha/2) - estado[1]*np.cos(alpha/2))**2 +
-                  np.abs(estado[2]*np.sin(alpha/2) - estado[3]*np.cos(alpha/2))**2)
-        return p_plus, p_minus
-
-def simular_medida_quantica(estado, alpha, n_simulaciones):
-    """Simula n mesures quàntiques de l'estat"""
-    estado = normalizar_estado(estado)
-    resultados = {'++': 0, '+-': 0, '-+': 0, '--': 0}
-    valores_A = []
-    valores_B = []
-
-    for _ in range(n_simulaciones):
-        # Mesura primer qubit en base z
-        p0, p1 = probabilidad_medida(estado, 'z')
-        rand1 = random.random()
-        if rand1 < p0:
-            resultado_A = 1
-            # Col·lapse estat: només components [0],[1]
-            norm = np.sqrt(np.abs(estado[0])**2 + np.abs(estado[1])**2)
-            estado_colapsat = np.array([estado[0], estado[1], 0, 0]) / norm if norm != 0 else np.array([0,0,0,0])
-        else:
-            resultado_A = -1
-            norm = np.sqrt(np.abs(estado[2])**2 + np.abs(estado[3])**2)
-            estado_colapsat = np.array([0, 0, estado[2], estado[3]]) / norm if norm != 0 else np.array([0,0,0,0])
-
-        # Mesura segon qubit en base alpha
-        p_plus, p_minus = probabilidad_medida(estado_colapsat, alpha)
-        rand2 = random.random()
-        if rand2 < p_plus:
-            resultado_B = 1
-        else:
-            resultado_B = -1
-
-        # Registrem els resultats
-        if resultado_A == 1 and resultado_B == 1:
-            resultados['++'] += 1
-        elif resultado_A == 1 and resultado_B == -1:
-            resultados['+-'] += 1
-        elif resultado_A == -1 and resultado_B == 1:
-            resultados['-+'] += 1
-        else:
-            resultados['--'] += 1
-
-        valores_A.append(resultado_A)
-        valores_B.append(resultado_B)
-
-    # Calculem valors promig
-    A_avg = np.mean(valores_A)
-    B_avg = np.mean(valores_B)
-    sum_avg = np.mean([a + b for a, b in zip(valores_A, valores_B)])
-    prod_avg = np.mean([a * b for a, b in zip(valores_A, valores_B)])
-
-    # Calculem percentatges
-    total = n_simulaciones
-    percentatges = {
-        '%++': resultados['++'] / total * 100,
-        '%+-': resultados['+-'] / total * 100,
-        '%-+': resultados['-+'] / total * 100,
-        '%--': resultados['--'] / total * 100
-    }
-
-    return resultados, percentatges, A_avg, B_avg, sum_avg, prod_avg
-
-def calcular_probabilidades_teoricas(estado, alpha):
-    """Calcula les probabilitats teòriques"""
-    estado = normalizar_estado(estado)
-    p_plus_plus = np.abs(estado[0]*np.cos(alpha/2) + estado[1]*np.sin(alpha/2))**2
-    p_plus_minus = np.abs(estado[0]*np.sin(alpha/2) - estado[1]*np.cos(alpha/2))**2
-    p_minus_plus = np.abs(estado[2]*np.cos(alpha/2) + estado[3]*np.sin(alpha/2))**2
-    p_minus_minus = np.abs(estado[2]*np.sin(alpha/2) - estado[3]*np.cos(alpha/2))**2
-    return [p_plus_plus, p_plus_minus, p_minus_plus, p_minus_minus]
-
-def calcular_valors_esperats_teorics(estado, alpha):
-    """Calcula els valors esperats teòrics"""
-    estado = normalizar_estado(estado)
-    E_prod = (np.abs(estado[0]*np.cos(alpha/2) + estado[1]*np.sin(alpha/2))**2 +
-              np.abs(estado[2]*np.sin(alpha/2) - estado[3]*np.cos(alpha/2))**2 -
-              np.abs(estado[0]*np.sin(alpha/2) - estado[1]*np.cos(alpha/2))**2 -
-              np.abs(estado[2]*np.cos(alpha/2) + estado[3]*np.sin(alpha/2))**2)
-    E_A = (np.abs(estado[0])**2 + np.abs(estado[1])**2 -
-           np.abs(estado[2])**2 - np.abs(estado[3])**2)
-    E_B = (np.abs(estado[0]*np.cos(alpha/2) + estado[1]*np.sin(alpha/2))**2 +
-           np.abs(estado[2]*np.cos(alpha/2) + estado[3]*np.sin(alpha/2))**2 -
-           np.abs(estado[0]*np.sin(alpha/2) - estado[1]*np.cos(alpha/2))**2 -
-           np.abs(estado[2]*np.sin(alpha/2) - estado[3]*np.cos(alpha/2))**2)
-    return E_A, E_B, E_prod
+from chsh import valor_S
+from mesura_conjunta import (normalizar_estado, probabilidad_medida, simular_medida_quantica,
+                             PaquetMesura, clau_estat, paquet_teoric,
+                             calcular_probabilidades_teoricas, calcular_valors_esperats_teorics)
 
 def visualizar_experimento(alpha, resultados, percentatges, A_avg, B_avg, sum_avg, prod_avg, 
                           probs_teoricas, estado, n_simulaciones):
     """Visualitza l'experiment i els resultats"""
+    # matplotlib només es carrega quan cal dibuixar
+    import matplotlib.pyplot as plt
+    from matplotlib.patches import Rectangle
+
     fig = plt.figure(figsize=(16, 10))
 
     # Diagrama detectors SG
@@ -179,17 +77,18 @@ def visualizar_experimento(alpha, resultados, percentatges, A_avg, B_avg, sum_av
     # Verificació de la desigualtat CHSH
     ax4 = fig.add_subplot(2, 2, 4)
     ax4.axis('off')
+    S_teoric = valor_S(estado)[0, 0]
     texto_chsh = f"""
     DESIGUALTAT CHSH:
     S = E(a,b) - E(a,b') + E(a',b) + E(a',b')
     
-    Per a α=0, el valor del producte és: {prod_avg:.3f}
+    Per a α={np.degrees(alpha):.1f}°, el valor del producte és: {prod_avg:.3f}
     
     Límit clàssic: |S| ≤ 2
     Límit quàntic: |S| ≤ 2√2 ≈ 2.828
     
-    NOTA: Per veure la violació CHSH completa, caldria simular
-    amb diferents angles (0°, 45°, 90°, 135°) i calcular S.
+    S teòric amb a=0°, a'=90°, b=45°, b'=135°: {S_teoric:.3f}
+    (per a escombrats d'estats i angles, vegeu chsh.py)
     """
     ax4.text(0.1, 0.7, texto_chsh, ha='left', va='top', fontfamily='monospace', fontsize=10)
 
@@ -198,15 +97,18 @@ def visualizar_experimento(alpha, resultados, percentatges, A_avg, B_avg, sum_av
 
 # ...existing code...
 
-def mostrar_resultats(estado, alpha, n_simulaciones):
+def mostrar_resultats(estado, alpha, n_simulaciones, rng=None):
     estado_normalizado = normalizar_estado(estado)
     resultados, percentatges, A_avg, B_avg, sum_avg, prod_avg = simular_medida_quantica(
-        estado_normalizado, alpha, n_simulaciones)
+        estado_normalizado, alpha, n_simulaciones, rng)
     probs_teoricas = calcular_probabilidades_teoricas(estado_normalizado, alpha)
     visualizar_experimento(alpha, resultados, percentatges, A_avg, B_avg, sum_avg, prod_avg,
                            probs_teoricas, estado_normalizado, n_simulaciones)
 
 def main():
+    import matplotlib.pyplot as plt
+    from matplotlib.widgets import TextBox, Button
+
     def executar(event):
         try:
             a = float(text_a_real.text) + 1j * float(text_a_imag.text)
@@ -1,61 +1,104 @@
-import tkinter as tk
-from tkinter import ttk
 import numpy as np
-import matplotlib.pyplot as plt
-from matplotlib.figure import Figure
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from evolucio_espins import EvolucioEspins, SerieTemporal, ESTAT_AMUNT_AVALL, concurrencia, hamiltonia_heisenberg
+from evolucio_oberta import EvolucioOberta, concurrencia_wootters
+from instrumentacio import comptar, instrumentar
+
+BASIS_LABELS = [r'$|\uparrow\uparrow\rangle$', r'$|\uparrow\downarrow\rangle$', r'$|\downarrow\uparrow\rangle$', r'$|\downarrow\downarrow\rangle$']
+BASIS_NAMES = ['|↑↑⟩', '|↑↓⟩', '|↓↑⟩', '|↓↓⟩']
+BASIS_STYLES = ['c:', 'b-', 'r--', 'm-.']
 
 class EntanglementVisualizer:
-    def __init__(self, master):
+    def __init__(self, master, fast_redraw=True, hamiltonian=None, initial_state=ESTAT_AMUNT_AVALL,
+                 hamiltonian_label="C S1·S2", t_max=4 * np.pi, dephasing=0.0, damping=0.0):
         self.master = master
-        self.master.title("Visualitzador d'Evolució d'Entrellaçament (H = C S1·S2)")
-        self.master.geometry("1000x800")
+        # Mode ràpid: es reutilitzen els artistes, es fa blit sobre un fons
+        # guardat i les ràfegues del slider s'agrupen en un sol dibuix per frame
+        self.fast_redraw = fast_redraw
+        self.frame_ms = 16
+        self._pending_time = 0.0
+        self._redraw_scheduled = False
+        self._background = None
+        self.hamiltonian_label = hamiltonian_label
 
         # --- Paràmetres de la física (simplifiquem C*hbar = 1) ---
         self.omega = 1.0
-        self.t_max = 4 * np.pi
-        self.time_points = np.linspace(0, self.t_max, 400)
+        self.t_max = t_max
 
-        # --- Calculem l'evolució sencera ---
-        self.c01 = np.cos(self.omega * self.time_points / 2)
-        self.c10 = -1j * np.sin(self.omega * self.time_points / 2)
-        self.prob01 = np.abs(self.c01)**2
-        self.prob10 = np.abs(self.c10)**2
-        self.concurrence = np.abs(np.sin(self.omega * self.time_points))
+        # --- Evolució ---
+        # Per defecte H = C S1·S2 amb C = omega, des de |↑↓⟩. H es diagonalitza
+        # un sol cop; les corbes es calculen a demanda només per a la finestra
+        # visible i el cursor s'avalua exactament al temps demanat.
+        if hamiltonian is None:
+            hamiltonian = hamiltonia_heisenberg(self.omega)
+        self.evolution = EvolucioEspins(hamiltonian, initial_state)
+        self.series = SerieTemporal(self.observables, durada_bloc=2 * np.pi / self.omega)
+        # Estats base que intervenen en l'evolució (els altres són sempre 0)
+        self.active_states = self.evolution.estats_base_actius()
 
-        # --- Configuració de la GUI ---
-        main_frame = ttk.Frame(self.master)
-        main_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        # Amb decoherència es fa servir la matriu densitat (equació de Lindblad)
+        self.open_evolution = None
+        if dephasing > 0 or damping > 0:
+            self.open_evolution = EvolucioOberta(hamiltonian, initial_state, dephasing, damping)
+            self.active_states = [0, 1, 2, 3]
 
         # --- Creació de la figura i els subplots de Matplotlib ---
+        from matplotlib.figure import Figure
         self.fig = Figure(figsize=(10, 7), dpi=100)
         self.ax_probs = self.fig.add_subplot(3, 1, 1)
-        self.ax_concurrence = self.fig.add_subplot(3, 1, 2)
+        self.ax_concurrence = self.fig.add_subplot(3, 1, 2, sharex=self.ax_probs)
         self.ax_state_bar = self.fig.add_subplot(3, 1, 3)
         self.fig.tight_layout(pad=3.0)
 
-        self.canvas = FigureCanvasTkAgg(self.fig, master=main_frame)
-        self.canvas.get_tk_widget().pack(side=tk.TOP, fill=tk.BOTH, expand=True)
-
-        # --- Slider de temps ---
-        self.time_slider = ttk.Scale(main_frame, from_=0, to=self.t_max, orient=tk.HORIZONTAL)
-        self.time_slider.pack(side=tk.BOTTOM, fill=tk.X, pady=10)
+        # Amb master=None no hi ha finestra: la figura es dibuixa amb el
+        # backend Agg (per exemple per als benchmarks sense pantalla)
+        if self.master is None:
+            from matplotlib.backends.backend_agg import FigureCanvasAgg
+            self.canvas = FigureCanvasAgg(self.fig)
+        else:
+            self.create_widgets()
         
         # --- Dibuix inicial I connexió del slider (ORDRE CORREGIT) ---
         # 1. Dibuixa els gràfics estàtics i crea els atributs .prob_line etc.
         self.setup_static_plots() 
+        if self.fast_redraw:
+            for artist in self.animated_artists():
+                artist.set_animated(True)
+            self.canvas.mpl_connect('draw_event', self.on_draw)
         
         # 2. Ara que els atributs existeixen, connecta el command del slider
-        self.time_slider.config(command=self.update_plots)
-        
         # 3. Posa el valor inicial del slider i actualitza el gràfic manualment
-        self.time_slider.set(0)
-        self.update_plots(0)
+        if self.master is not None:
+            self.time_slider.config(command=self.update_plots)
+            self.time_slider.set(0)
+        self._pending_time = 0.0
+        self.canvas.draw()
+        self.redraw_plots()
+
+    def create_widgets(self):
+        # tkinter i el backend TkAgg només es carreguen quan es crea la finestra
+        import tkinter as tk
+        from tkinter import ttk
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
+
+        self.master.title(f"Visualitzador d'Evolució d'Entrellaçament (H = {self.hamiltonian_label})")
+        self.master.geometry("1000x800")
+        main_frame = ttk.Frame(self.master)
+        main_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+
+        self.canvas = FigureCanvasTkAgg(self.fig, master=main_frame)
+        self.canvas.get_tk_widget().pack(side=tk.TOP, fill=tk.BOTH, expand=True)
+        # Barra d'eines per fer zoom: en canviar la finestra es recalculen les corbes
+        self.toolbar = NavigationToolbar2Tk(self.canvas, main_frame)
+
+        # --- Slider de temps ---
+        self.time_slider = ttk.Scale(main_frame, from_=0, to=self.t_max, orient=tk.HORIZONTAL)
+        self.time_slider.pack(side=tk.BOTTOM, fill=tk.X, pady=10)
 
     def setup_static_plots(self):
         # Gràfic de probabilitats
-        self.ax_probs.plot(self.time_points, self.prob01, 'b-', label=r'$P(|\uparrow\downarrow\rangle) = |\cos(\omega t/2)|^2$')
-        self.ax_probs.plot(self.time_points, self.prob10, 'r--', label=r'$P(|\downarrow\uparrow\rangle) = |\sin(\omega t/2)|^2$')
+        self.prob_curves = {}
+        for k in self.active_states:
+            self.prob_curves[k], = self.ax_probs.plot([], [], BASIS_STYLES[k], label=f'$P({BASIS_LABELS[k][1:-1]})$')
         self.ax_probs.set_title("Evolució de les Probabilitats dels Estats Base")
         self.ax_probs.set_ylabel("Probabilitat")
         self.ax_probs.set_ylim(-0.1, 1.1)
@@ -63,7 +106,7 @@ class EntanglementVisualizer:
         self.ax_probs.grid(True, linestyle=':')
 
         # Gràfic de concurrència
-        self.ax_concurrence.plot(self.time_points, self.concurrence, 'g-', label=r'$\mathcal{C}(t) = |\sin(\omega t)|$')
+        self.concurrence_curve, = self.ax_concurrence.plot([], [], 'g-', label=r'$\mathcal{C}(t)$')
         self.ax_concurrence.set_title("Evolució de l'Entrellaçament (Concurrència)")
         self.ax_concurrence.set_xlabel("Temps (t) en unitats de 1/ω")
         self.ax_concurrence.set_ylabel("Concurrència")
@@ -75,39 +118,103 @@ class EntanglementVisualizer:
         self.prob_line = self.ax_probs.axvline(0, color='k', linestyle='--')
         self.concurrence_line = self.ax_concurrence.axvline(0, color='k', linestyle='--')
 
+        # Gràfic de barres: les barres i el títol es creen un sol cop i
+        # després només se'n canvien les alçades i el text
+        self.state_bars = self.ax_state_bar.bar(BASIS_LABELS, [0, 0, 0, 0], color=['gray', 'blue', 'red', 'gray'])
+        self.ax_state_bar.set_title("")
+        self.ax_state_bar.set_ylabel("Probabilitat")
+        self.ax_state_bar.set_ylim(0, 1.1)
+
+        # Les corbes es recalculen cada cop que canvia la finestra visible
+        self.ax_probs.callbacks.connect('xlim_changed', self.refresh_series)
+        self.ax_probs.set_xlim(0, self.t_max)
+
+    def observables(self, t):
+        """Probabilitats dels estats base i concurrència, forma (len(t), 5)"""
+        if self.open_evolution is not None:
+            rho = self.open_evolution.matrius_densitat(t)
+            probs = np.diagonal(rho, axis1=-2, axis2=-1).real
+            return np.column_stack([probs, concurrencia_wootters(rho)])
+        states = self.evolution.estats(t)
+        return np.column_stack([np.abs(states)**2, concurrencia(states)])
+
+    def refresh_series(self, ax=None):
+        """Posa a les corbes les dades de la finestra visible, amb resolució de pantalla"""
+        t0, t1 = self.ax_probs.get_xlim()
+        t0, t1 = max(t0, 0.0), min(t1, self.t_max)
+        if t1 <= t0:
+            return
+        n_points = max(int(self.ax_probs.bbox.width), 200)
+        t, values = self.series.finestra(t0, t1, n_points)
+        for k, curve in self.prob_curves.items():
+            curve.set_data(t, values[:, k])
+        self.concurrence_curve.set_data(t, values[:, 4])
+
+    def animated_artists(self):
+        """Artistes que canvien amb el temps i es redibuixen amb blit"""
+        return [self.prob_line, self.concurrence_line, *self.state_bars, self.ax_state_bar.title]
+
+    def on_draw(self, event):
+        """Després d'un dibuix complet (inici, canvi de mida) guarda el fons"""
+        self._background = self.canvas.copy_from_bbox(self.fig.bbox)
+        for artist in self.animated_artists():
+            self.fig.draw_artist(artist)
+
+    @instrumentar('EntanglementVisualizer.update_plots')
     def update_plots(self, time_val_str):
-        time_val = float(time_val_str)
+        self._pending_time = float(time_val_str)
+        # Sense bucle d'esdeveniments (master=None) no hi ha frames per agrupar
+        if not self.fast_redraw or self.master is None:
+            self.redraw_plots()
+        elif not self._redraw_scheduled:
+            # Només es dibuixa l'últim valor rebut dins de cada frame
+            self._redraw_scheduled = True
+            self.master.after(self.frame_ms, self.redraw_plots)
+
+    @instrumentar('EntanglementVisualizer.redraw_plots')
+    def redraw_plots(self):
+        self._redraw_scheduled = False
+        time_val = self._pending_time
         
         # Actualitza les línies verticals
         self.prob_line.set_xdata([time_val, time_val])
         self.concurrence_line.set_xdata([time_val, time_val])
         
-        # Troba l'índex de temps més proper
-        idx = (np.abs(self.time_points - time_val)).argmin()
-        
-        # Valors actuals
-        p01 = self.prob01[idx]
-        p10 = self.prob10[idx]
-        conc = self.concurrence[idx]
+        # Si el cursor surt de la finestra visible, la desplacem perquè el segueixi
+        t0, t1 = self.ax_probs.get_xlim()
+        if not t0 <= time_val <= t1:
+            width = t1 - t0
+            t0 = min(max(time_val - width / 2, 0.0), max(self.t_max - width, 0.0))
+            self.ax_probs.set_xlim(t0, t0 + width)
+            self._background = None
+
+        # Valors actuals, exactes al temps demanat
+        probs, conc = np.split(self.observables(np.array([time_val]))[0], [4])
+        conc = conc[0]
 
         # Actualitza el títol del gràfic de barres
         title = (f"Estat a t={time_val:.2f}:  "
-                 f"P(|↑↓⟩)={p01:.2f}, P(|↓↑⟩)={p10:.2f}  |  "
-                 f"Concurrència={conc:.2f}")
+                 + ", ".join(f"P({BASIS_NAMES[k]})={probs[k]:.2f}" for k in self.active_states)
+                 + f"  |  Concurrència={conc:.2f}")
 
         # Actualitza el gràfic de barres
-        self.ax_state_bar.clear()
-        labels = [r'$|\uparrow\uparrow\rangle$', r'$|\uparrow\downarrow\rangle$', r'$|\downarrow\uparrow\rangle$', r'$|\downarrow\downarrow\rangle$']
-        probs = [0, p01, p10, 0]
-        self.ax_state_bar.bar(labels, probs, color=['gray', 'blue', 'red', 'gray'])
-        self.ax_state_bar.set_title(title)
-        self.ax_state_bar.set_ylabel("Probabilitat")
-        self.ax_state_bar.set_ylim(0, 1.1)
+        for bar, prob in zip(self.state_bars, probs):
+            bar.set_height(prob)
+        self.ax_state_bar.title.set_text(title)
         
-        # Redibuixa el canvas
-        self.canvas.draw()
+        # Redibuixa només els artistes que canvien, o tot el canvas
+        if self.fast_redraw and self._background is not None:
+            self.canvas.restore_region(self._background)
+            for artist in self.animated_artists():
+                self.fig.draw_artist(artist)
+            self.canvas.blit(self.fig.bbox)
+            comptar('blits')
+        else:
+            self.canvas.draw()
+            comptar('dibuixos_complets')
 
 if __name__ == "__main__":
+    import tkinter as tk
     root = tk.Tk()
     app = EntanglementVisualizer(root)
     root.mainloop()
\ No newline at end of file
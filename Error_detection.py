@@ -1,12 +1,24 @@
-import random
+import numpy as np
+from math import comb, exp, lgamma, log, sqrt
+from statistics import NormalDist
+from functools import partial
+from aleatorietat import aleatori_python, executar_per_blocs
+from instrumentacio import comptar, instrumentar
 
-def simular_canal(epsilon, N=100000):
+@instrumentar('simular_canal')
+def simular_canal(epsilon, N=100000, rng=None):
+    comptar('assajos', N)
+    aleatori = aleatori_python(rng)
 
+    # Cada assaig de 4 bits para al primer error: i + 1 nombres aleatoris
     errors_4bits = 0
+    nombres_4bits = 0
     for _ in range(N):
-        fallada = any(random.random() < epsilon for _ in range(4))
-        if fallada:
-            errors_4bits += 1
+        for i in range(4):
+            if aleatori.random() < epsilon:
+                errors_4bits += 1
+                break
+        nombres_4bits += i + 1
     
     perc_corruptes_4 = (errors_4bits / N) * 100
 
@@ -14,28 +26,112 @@ def simular_canal(epsilon, N=100000):
     detectats = 0
     for _ in range(N):
 
-        n_errors = sum(1 for _ in range(5) if random.random() < epsilon)
+        n_errors = sum(1 for _ in range(5) if aleatori.random() < epsilon)
         
         if n_errors > 0:
             fallades_5bits += 1
             if n_errors % 2 != 0:
                 detectats += 1
                 
+    comptar('nombres_aleatoris', nombres_4bits + 5 * N)
     perc_corruptes_5 = (fallades_5bits / N) * 100
     perc_detectats_sobre_errors = (detectats / fallades_5bits) * 100
 
     return perc_corruptes_4, perc_detectats_sobre_errors
 
-e1 = 0.1
-p4, p_det = simular_canal(e1)
+def simular_paritat(epsilon, N=100000, n_bits=5, grups=None, rng=None, mida_lot=100000):
+    """Simula N blocs de n_bits i compta quants es corrompen i quants es detecten.
+
+    grups és una llista de comprovacions de paritat, cadascuna amb els índexs
+    dels bits que cobreix (inclòs el seu bit de paritat). Un bloc es detecta si
+    alguna comprovació veu un nombre senar d'errors. Amb grups=None hi ha una
+    única paritat sobre tot el bloc (com el codi de 5 bits) i n'hi ha prou amb
+    mostrejar quants blocs tenen cada nombre d'errors; amb grups=[] no hi ha
+    cap comprovació (com el símbol cru de 4 bits).
+
+    Retorna (blocs_corruptes, blocs_detectats) com a comptes enters.
+    """
+    rng = np.random.default_rng(rng)
+
+    if grups is None or len(grups) == 0:
+        # El pes de l'error de cada bloc és Binomial(n_bits, epsilon); els N
+        # blocs donen directament una multinomial sobre els pesos 0..n_bits
+        pesos = np.arange(n_bits + 1)
+        p_pes = np.array([comb(n_bits, w) for w in pesos]) * epsilon**pesos * (1 - epsilon)**(n_bits - pesos)
+        comptes = rng.multinomial(N, p_pes / p_pes.sum())
+        detectats = int(comptes[1::2].sum()) if grups is None else 0
+        return int(N - comptes[0]), detectats
+
+    H = np.zeros((len(grups), n_bits), dtype=np.uint8)
+    for i, grup in enumerate(grups):
+        H[i, list(grup)] = 1
+
+    corruptes = 0
+    detectats = 0
+    fets = 0
+    while fets < N:
+        n = min(mida_lot, N - fets)
+        errors = (rng.random((n, n_bits)) < epsilon).astype(np.uint8)
+        sindromes = (errors @ H.T) & 1
+        corruptes += int(np.count_nonzero(errors.any(axis=1)))
+        detectats += int(np.count_nonzero(sindromes.any(axis=1)))
+        fets += n
+    return corruptes, detectats
+
+def simular_canal_vectorial(epsilon, N=100000, rng=None):
+    """Versió NumPy de simular_canal: mateixos percentatges, sense bucles per bit"""
+    rng = np.random.default_rng(rng)
+    errors_4bits, _ = simular_paritat(epsilon, N, n_bits=4, grups=[], rng=rng)
+    fallades_5bits, detectats = simular_paritat(epsilon, N, n_bits=5, rng=rng)
+
+    perc_corruptes_4 = (errors_4bits / N) * 100
+    perc_detectats_sobre_errors = (detectats / fallades_5bits) * 100
+    return perc_corruptes_4, perc_detectats_sobre_errors
+
+# --- Probabilitats exactes, vectoritzades sobre epsilon ---
 
-print(f"Resultats per epsilon = {e1}:")
-print(f"- Símbols corruptes (4 bits): {p4:.2f}% (Teòric: 34.39%)")
-print(f"- Dels que fallen (5 bits), detectats: {p_det:.2f}% (Teòric: 82.09%)")
+def probabilitats_paritat(epsilon_0, epsilon_1=None, k=4):
+    """Probabilitats exactes del símbol cru de k bits i del bloc de k+1 bits amb paritat.
 
-import random
+    Un 0 es canvia amb probabilitat epsilon_0 i un 1 amb epsilon_1 (per
+    defecte igual, canal simètric); les dades són uniformes. Per a una
+    paraula amb z zeros i u uns, P(cap error) = (1-e0)^z (1-e1)^u i
+    P(nombre senar d'errors) = (1 - (1-2e0)^z (1-2e1)^u) / 2; es fa la
+    mitjana sobre el pes w de les dades. epsilon_0 i epsilon_1 poden ser
+    arrays (es fa broadcasting) i el resultat és un diccionari d'arrays:
+    'corruptes_cru', 'corruptes', 'detectats' i 'detectats_sobre_errors'.
+    """
+    e0 = np.asarray(epsilon_0, dtype=float)
+    e1 = e0 if epsilon_1 is None else np.asarray(epsilon_1, dtype=float)
+    e0, e1 = (x[..., None] for x in np.broadcast_arrays(e0, e1))
+    w = np.arange(k + 1)
+    pesos = np.array([comb(k, i) for i in w]) / 2**k
+    u = w + w % 2
+    z = k + 1 - u
+    corruptes_cru = 1 - ((1 - e0)**(k - w) * (1 - e1)**w) @ pesos
+    corruptes = 1 - ((1 - e0)**z * (1 - e1)**u) @ pesos
+    detectats = (1 - ((1 - 2 * e0)**z * (1 - 2 * e1)**u) @ pesos) / 2
+    with np.errstate(invalid='ignore', divide='ignore'):
+        sobre_errors = np.where(corruptes > 0, detectats / np.where(corruptes > 0, corruptes, 1.0), np.nan)
+    # [()] torna un escalar si els epsilons ho eren
+    return {'corruptes_cru': corruptes_cru[()], 'corruptes': corruptes[()],
+            'detectats': detectats[()], 'detectats_sobre_errors': sobre_errors[()]}
 
-def simular_shannon_asimmetric(epsilon_1, N=100000):
+def canal_exacte(epsilon):
+    """Valors exactes de simular_canal (en %), per a un epsilon o un array"""
+    p = probabilitats_paritat(epsilon)
+    return p['corruptes_cru'] * 100, p['detectats_sobre_errors'] * 100
+
+if __name__ == "__main__":
+    e1 = 0.1
+    p4, p_det = simular_canal(e1)
+    t4, t_det = canal_exacte(e1)
+
+    print(f"Resultats per epsilon = {e1}:")
+    print(f"- Símbols corruptes (4 bits): {p4:.2f}% (Teòric: {t4:.2f}%)")
+    print(f"- Dels que fallen (5 bits), detectats: {p_det:.2f}% (Teòric: {t_det:.2f}%)")
+
+def simular_shannon_asimmetric(epsilon_1, N=100000, rng=None):
     alfabet = [
         (1/2, 0),    # x0: 0
         (1/4, 1),    # x1: 10
@@ -48,9 +144,10 @@ def simular_shannon_asimmetric(epsilon_1, N=100000):
     ]
     
     simbols_corruptes = 0
+    aleatori = aleatori_python(rng)
     
     for _ in range(N):
-        r = random.random()
+        r = aleatori.random()
         acumulada = 0
         n_uns = 0
         
@@ -62,7 +159,7 @@ def simular_shannon_asimmetric(epsilon_1, N=100000):
         
         ha_fallat = False
         for _ in range(n_uns):
-            if random.random() < epsilon_1:
+            if aleatori.random() < epsilon_1:
                 ha_fallat = True
                 break
         
@@ -71,9 +168,266 @@ def simular_shannon_asimmetric(epsilon_1, N=100000):
             
     return (simbols_corruptes / N) * 100
 
-e1 = 0.1
-percentatge = simular_shannon_asimmetric(e1)
+class CodiPrefix:
+    """Codi de longitud variable amb taules precalculades per simular-lo.
+
+    paraules és la llista de paraules del codi ('0', '10', '110', ...) i
+    probs la probabilitat de cada símbol. Es construeix una taula d'àlies
+    per mostrejar símbols en temps constant i es compten els zeros i uns de
+    cada paraula per calcular la probabilitat de corrupció en forma tancada.
+    """
+
+    def __init__(self, paraules, probs):
+        self.paraules = list(paraules)
+        probs = np.asarray(probs, dtype=float)
+        if len(self.paraules) != len(probs):
+            raise ValueError("Cal una probabilitat per a cada paraula del codi")
+        ordenades = sorted(self.paraules)
+        for a, b in zip(ordenades, ordenades[1:]):
+            if b.startswith(a):
+                raise ValueError(f"El codi no és prefix: '{a}' és prefix de '{b}'")
+        self.probs = probs / probs.sum()
+        self.n_uns = np.array([p.count('1') for p in self.paraules])
+        self.n_zeros = np.array([p.count('0') for p in self.paraules])
+        self.longituds = self.n_uns + self.n_zeros
+        self._construir_alies()
+
+    def _construir_alies(self):
+        """Taula d'àlies de Vose"""
+        K = len(self.probs)
+        escalades = self.probs * K
+        self.prob_alies = np.ones(K)
+        self.alies = np.arange(K)
+        petits = [i for i in range(K) if escalades[i] < 1]
+        grans = [i for i in range(K) if escalades[i] >= 1]
+        while petits and grans:
+            s, g = petits.pop(), grans.pop()
+            self.prob_alies[s] = escalades[s]
+            self.alies[s] = g
+            escalades[g] -= 1 - escalades[s]
+            (petits if escalades[g] < 1 else grans).append(g)
+
+    def mostrejar(self, n, rng):
+        """Índexs de n símbols mostrejats segons probs"""
+        i = rng.integers(len(self.probs), size=n)
+        return np.where(rng.random(n) < self.prob_alies[i], i, self.alies[i])
+
+    def prob_corrupcio(self, epsilon_0, epsilon_1):
+        """Probabilitat que cada paraula tingui almenys un bit canviat"""
+        return 1 - (1 - epsilon_0)**self.n_zeros * (1 - epsilon_1)**self.n_uns
+
+    def simular(self, N, epsilon_0, epsilon_1, rng=None, mida_lot=1000000):
+        """Envia N símbols pel canal; retorna (símbols, corruptes) per paraula"""
+        rng = np.random.default_rng(rng)
+        p_corr = self.prob_corrupcio(epsilon_0, epsilon_1)
+        K = len(self.probs)
+        simbols = np.zeros(K, dtype=np.int64)
+        corruptes = np.zeros(K, dtype=np.int64)
+        fets = 0
+        while fets < N:
+            n = min(mida_lot, N - fets)
+            idx = self.mostrejar(n, rng)
+            fallen = rng.random(n) < p_corr[idx]
+            simbols += np.bincount(idx, minlength=K)
+            corruptes += np.bincount(idx[fallen], minlength=K)
+            fets += n
+        return simbols, corruptes
+
+CODI_SHANNON = CodiPrefix(['0', '10', '110', '1110', '11110', '111110', '1111110', '1111111'],
+                          [1/2, 1/4, 1/8, 1/16, 1/32, 1/64, 1/128, 1/128])
+
+def simular_shannon_vectorial(epsilon_1, N=100000, epsilon_0=0.0, codi=CODI_SHANNON, rng=None):
+    """Versió amb taules de simular_shannon_asimmetric; admet qualsevol codi i epsilon_0"""
+    _, corruptes = codi.simular(N, epsilon_0, epsilon_1, rng)
+    return (corruptes.sum() / N) * 100
+
+def shannon_exacte(epsilon_1, epsilon_0=0.0, codi=CODI_SHANNON):
+    """Valor exacte de simular_shannon_vectorial (en %), per a epsilons escalars o arrays"""
+    e0, e1 = np.broadcast_arrays(np.asarray(epsilon_0, dtype=float), np.asarray(epsilon_1, dtype=float))
+    return codi.prob_corrupcio(e0[..., None], e1[..., None]) @ codi.probs * 100
+
+# --- Simulació en streaming amb intervals de confiança ---
+
+def interval_wilson(k, n, nivell=0.95):
+    """Interval de Wilson per a una proporció k/n"""
+    if n == 0:
+        return 0.0, 1.0
+    z = NormalDist().inv_cdf((1 + nivell) / 2)
+    centre = (k + z**2 / 2) / (n + z**2)
+    semiamplada = z / (n + z**2) * sqrt(k * (n - k) / n + z**2 / 4)
+    return max(0.0, centre - semiamplada), min(1.0, centre + semiamplada)
+
+def _beta_regularitzada(x, a, b):
+    """Funció beta incompleta regularitzada I_x(a, b) (fracció contínua de Lentz)"""
+    if x <= 0:
+        return 0.0
+    if x >= 1:
+        return 1.0
+    if x > (a + 1) / (a + b + 2):
+        return 1.0 - _beta_regularitzada(1 - x, b, a)
+    prefactor = exp(lgamma(a + b) - lgamma(a) - lgamma(b) + a * log(x) + b * log(1 - x)) / a
+    petit = 1e-300
+    c, d = 1.0, 1.0 - (a + b) * x / (a + 1)
+    d = 1.0 / (d if abs(d) > petit else petit)
+    f = d
+    m = 1
+    while m < 10**7:
+        for coef in (m * (b - m) * x / ((a + 2*m - 1) * (a + 2*m)),
+                     -(a + m) * (a + b + m) * x / ((a + 2*m) * (a + 2*m + 1))):
+            d = 1.0 + coef * d
+            d = 1.0 / (d if abs(d) > petit else petit)
+            c = 1.0 + coef / c
+            c = c if abs(c) > petit else petit
+            f *= c * d
+        if abs(c * d - 1.0) < 1e-15:
+            break
+        m += 1
+    return prefactor * f
+
+def _quantil_beta(q, a, b):
+    """Quantil q de la distribució Beta(a, b) per bisecció"""
+    baix, alt = 0.0, 1.0
+    for _ in range(100):
+        mig = (baix + alt) / 2
+        if _beta_regularitzada(mig, a, b) < q:
+            baix = mig
+        else:
+            alt = mig
+        if alt - baix < 1e-15:
+            break
+    return (baix + alt) / 2
+
+def interval_clopper_pearson(k, n, nivell=0.95):
+    """Interval exacte de Clopper-Pearson per a una proporció k/n"""
+    if n == 0:
+        return 0.0, 1.0
+    alfa = 1 - nivell
+    inferior = 0.0 if k == 0 else _quantil_beta(alfa / 2, k, n - k + 1)
+    superior = 1.0 if k == n else _quantil_beta(1 - alfa / 2, k + 1, n - k)
+    return inferior, superior
+
+INTERVALS = {'wilson': interval_wilson, 'clopper-pearson': interval_clopper_pearson}
+
+def simular_en_streaming(lot, proporcions, mida_lot=1000000, precisio=None,
+                         precisio_relativa=None, N_max=10**9, metode='wilson',
+                         nivell=0.95, estat=None, rng=None):
+    """Executa lot(n, rng) en blocs de mida_lot acumulant els comptes.
+
+    lot retorna un diccionari de comptes (ha d'incloure 'N'). proporcions
+    diu quines proporcions seguir: {nom: (clau_exits, clau_assajos)}.
+    S'atura quan totes les proporcions tenen un interval de semiamplada
+    <= precisio (absoluta) i <= precisio_relativa * p, o quan s'arriba a
+    N_max. estat és el diccionari de comptes d'una execució anterior, per
+    continuar-la on es va quedar.
+
+    Retorna (resultats, estat): per a cada proporció p, l'interval i els
+    comptes, i el diccionari de comptes acumulats.
+    """
+    rng = np.random.default_rng(rng)
+    interval = INTERVALS[metode]
+    estat = dict(estat) if estat is not None else {}
+    estat.setdefault('N', 0)
+
+    def resum():
+        resultats = {}
+        for nom, (clau_exits, clau_assajos) in proporcions.items():
+            k = estat.get(clau_exits, 0)
+            n = estat.get(clau_assajos, 0)
+            inf, sup = interval(k, n, nivell)
+            resultats[nom] = {'p': k / n if n else float('nan'), 'inf': inf, 'sup': sup,
+                              'exits': k, 'assajos': n}
+        return resultats
+
+    def precisio_assolida(resultats):
+        if precisio is None and precisio_relativa is None:
+            return False
+        for r in resultats.values():
+            semiamplada = (r['sup'] - r['inf']) / 2
+            if precisio is not None and semiamplada > precisio:
+                return False
+            if precisio_relativa is not None and not (r['exits'] > 0 and semiamplada <= precisio_relativa * r['p']):
+                return False
+        return True
+
+    resultats = resum()
+    while estat['N'] < N_max and not precisio_assolida(resultats):
+        n = min(mida_lot, N_max - estat['N'])
+        for clau, valor in lot(n, rng).items():
+            estat[clau] = estat.get(clau, 0) + valor
+        resultats = resum()
+    return resultats, estat
+
+def validar(k, n, p_exacte, nivell=0.95, metode='wilson'):
+    """Compara una proporció simulada k/n amb el valor exacte.
+
+    Retorna un diccionari amb l'estimació, l'interval, la desviació en
+    errors estàndard (z) i si el valor exacte cau dins de l'interval.
+    """
+    inf, sup = INTERVALS[metode](k, n, nivell)
+    p = k / n
+    error = sqrt(p_exacte * (1 - p_exacte) / n)
+    return {'p': p, 'exacte': p_exacte, 'inf': inf, 'sup': sup,
+            'z': (p - p_exacte) / error if error > 0 else 0.0, 'dins': inf <= p_exacte <= sup}
+
+def estimacio_control(y, x, mitjana_x):
+    """Estimació de la mitjana de y amb x com a variable de control.
+
+    y i x són mostres aparellades (per exemple proporcions per lot) i
+    mitjana_x és el valor exacte de E[x]. Amb el coeficient òptim
+    beta = cov(y, x) / var(x), l'estimador y - beta (x - mitjana_x) té la
+    variància reduïda en un factor 1 - corr(y, x)^2. Retorna
+    (estimació, error estàndard, beta).
+    """
+    y, x = np.asarray(y, dtype=float), np.asarray(x, dtype=float)
+    n = y.size
+    var_x = x.var(ddof=1)
+    beta = np.cov(y, x)[0, 1] / var_x if var_x > 0 else 0.0
+    corregida = y - beta * (x - mitjana_x)
+    return corregida.mean(), corregida.std(ddof=1) / sqrt(n), beta
+
+def _lot_canal(epsilon, n, rng):
+    """Comptes d'un bloc de n assajos de simular_canal"""
+    corruptes_4, _ = simular_paritat(epsilon, n, n_bits=4, grups=[], rng=rng)
+    corruptes_5, detectats_5 = simular_paritat(epsilon, n, n_bits=5, rng=rng)
+    return {'N': n, 'corruptes_4': corruptes_4, 'corruptes_5': corruptes_5,
+            'detectats_5': detectats_5}
+
+def simular_canal_streaming(epsilon, estat=None, rng=None, **opcions):
+    """simular_canal en streaming: fracció de símbols de 4 bits corruptes i
+    fracció de blocs de 5 bits amb error que es detecten, amb intervals"""
+    proporcions = {'corruptes_4': ('corruptes_4', 'N'),
+                   'detectats_sobre_errors': ('detectats_5', 'corruptes_5')}
+    return simular_en_streaming(lambda n, g: _lot_canal(epsilon, n, g), proporcions,
+                                estat=estat, rng=rng, **opcions)
+
+def simular_canal_per_blocs(epsilon, N, llavor=None, mida_bloc=10**6, processos=None):
+    """simular_canal_vectorial repartit en blocs entre processos.
+
+    Per a una llavor donada, els comptes no depenen del nombre de processos.
+    """
+    comptes = executar_per_blocs(partial(_lot_canal, epsilon), N, llavor, mida_bloc, processos)
+    return comptes['corruptes_4'] / N * 100, comptes['detectats_5'] / comptes['corruptes_5'] * 100
+
+def _lot_shannon(epsilon_0, epsilon_1, codi, n, rng):
+    """Comptes d'un bloc de n símbols de simular_shannon_asimmetric.
+
+    Només calen K + 1 variables: quants símbols de cada paraula
+    (multinomial) i quants d'aquests es corrompen (binomial).
+    """
+    simbols = rng.multinomial(n, codi.probs)
+    corruptes = rng.binomial(simbols, codi.prob_corrupcio(epsilon_0, epsilon_1))
+    return {'N': n, 'corruptes': int(corruptes.sum())}
+
+def simular_shannon_streaming(epsilon_1, epsilon_0=0.0, codi=CODI_SHANNON, estat=None, rng=None, **opcions):
+    """simular_shannon_asimmetric en streaming, amb interval de confiança"""
+    proporcions = {'corruptes': ('corruptes', 'N')}
+    return simular_en_streaming(lambda n, g: _lot_shannon(epsilon_0, epsilon_1, codi, n, g), proporcions,
+                                estat=estat, rng=rng, **opcions)
+
+if __name__ == "__main__":
+    e1 = 0.1
+    percentatge = simular_shannon_asimmetric(e1)
 
-print(f"Resultat Exercici 1 (Shannon) amb epsilon_1 = {e1} i epsilon_0 = 0:")
-print(f"Símbols corruptes: {percentatge:.2f}%")
-print(f"Teòric calculat abans: ~9.05%")
+    print(f"Resultat Exercici 1 (Shannon) amb epsilon_1 = {e1} i epsilon_0 = 0:")
+    print(f"Símbols corruptes: {percentatge:.2f}%")
+    print(f"Teòric: {shannon_exacte(e1):.2f}%")
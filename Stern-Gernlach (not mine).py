@@ -1,7 +1,8 @@
-import tkinter as tk
-from tkinter import ttk
 import numpy as np
-import random
+from cascada_sg import llegir_etapes, simular_cascada, valors_esperats_cascada
+from deflexio_sg import desviacio_pantalla, histograma_per_lots
+from instrumentacio import comptar, instrumentar
+from simulacio_sg import simular_stern_gerlach, valors_teorics
 
 # --- Constants de la Interfície ---
 BG_COLOR = "#f0f0f0"
@@ -11,6 +12,9 @@ MAGNET_WIDTH = 100
 MAGNET_HEIGHT = 200
 MAGNET_GAP = 40
 SCREEN_X = CANVAS_WIDTH - 50
+FRONT_BINS = (40, 200)    # cel·les (y, z) de l'histograma de la pantalla
+FRONT_ZOOM = 3    # píxels per cel·la de l'histograma a la vista frontal
+GRAY_PALETTE = np.array([f"#{l:02x}{l:02x}{l:02x}" for l in range(256)])
 
 class SternGerlachApp:
     def __init__(self, master):
@@ -23,6 +27,9 @@ class SternGerlachApp:
         self.c_down = 0.0 + 0.0j
         self.prob_up = 1.0
         self.prob_down = 0.0
+        # Un sol generador per a totes les simulacions de la finestra
+        self.rng = np.random.default_rng()
+        self.spatial_after = None
 
         # --- Interfície ---
         self.create_widgets()
@@ -30,6 +37,10 @@ class SternGerlachApp:
         self.update_and_calculate()
 
     def create_widgets(self):
+        # tkinter només es carrega quan es crea la finestra
+        import tkinter as tk
+        from tkinter import ttk
+
         # Frame principal
         main_frame = ttk.Frame(self.master, padding="10")
         main_frame.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
@@ -38,6 +49,16 @@ class SternGerlachApp:
         self.canvas = tk.Canvas(main_frame, width=CANVAS_WIDTH, height=CANVAS_HEIGHT, bg="white", highlightthickness=0)
         self.canvas.grid(row=0, column=0, rowspan=20, padx=(0, 20))
 
+        # --- Vista frontal de la pantalla: histograma 2D (y, z) de la simulació espacial ---
+        n_y, n_z = FRONT_BINS
+        self.front_canvas = tk.Canvas(main_frame, width=n_y * FRONT_ZOOM, height=CANVAS_HEIGHT, bg="white", highlightthickness=0)
+        self.front_canvas.grid(row=0, column=2, rowspan=20, padx=(20, 0))
+        # Una cel·la per píxel; es reomple a cada lot i s'amplia en dibuixar-la
+        self.front_cells = tk.PhotoImage(width=n_y, height=n_z)
+        self.front_image = None
+        self.front_item = self.front_canvas.create_image(0, 0, anchor=tk.NW)
+        self.front_canvas.create_text(n_y * FRONT_ZOOM / 2, 35, text="Pantalla (frontal)", font=("Helvetica", 10))
+
         # --- Panell de Control ---
         control_frame = ttk.Frame(main_frame)
         control_frame.grid(row=0, column=1, sticky=(tk.N, tk.S))
@@ -101,10 +122,34 @@ class SternGerlachApp:
         self.sim_counts_label = ttk.Label(control_frame, text="Comptes: ↑=N/A, ↓=N/A")
         self.sim_counts_label.grid(row=16, column=0, columnspan=4, sticky=tk.W, pady=(5,0))
 
+        self.sim_error_label = ttk.Label(control_frame, text="Error estàndard = N/A")
+        self.sim_error_label.grid(row=17, column=0, columnspan=4, sticky=tk.W)
+
+        # Separador
+        ttk.Separator(control_frame, orient='horizontal').grid(row=18, column=0, columnspan=4, sticky='ew', pady=10)
+
+        # Panell de cascada: etapes com "z!- x!- z" (eix o θ/φ en graus, "!±" bloqueja un port)
+        ttk.Label(control_frame, text="Cascada d'aparells", font=("Helvetica", 12, "bold")).grid(row=19, column=0, columnspan=4)
+        ttk.Label(control_frame, text="Etapes:").grid(row=20, column=0, sticky=tk.W)
+        self.cascade_var = tk.StringVar(value="z!- x!- z")
+        ttk.Entry(control_frame, textvariable=self.cascade_var, width=20).grid(row=20, column=1, columnspan=3, sticky=tk.W)
+
+        ttk.Button(control_frame, text="Simular Cascada", command=self.run_cascade).grid(row=21, column=0, columnspan=4, pady=10)
+
+        self.cascade_label = ttk.Label(control_frame, text="", justify=tk.LEFT, font=("Courier", 10))
+        self.cascade_label.grid(row=22, column=0, columnspan=4, sticky=tk.W)
+
+        # Simulació espacial: n àtoms travessen l'imant i impacten a la pantalla
+        self.spatial_button = ttk.Button(control_frame, text="Simulació Espacial", command=self.run_spatial_simulation)
+        self.spatial_button.grid(row=23, column=0, columnspan=4, pady=10)
+
+        self.spatial_label = ttk.Label(control_frame, text="Àtoms a la pantalla: N/A")
+        self.spatial_label.grid(row=24, column=0, columnspan=4, sticky=tk.W)
+
 
     def draw_apparatus(self):
         # Eix z
-        self.canvas.create_line(20, CANVAS_HEIGHT/2, 20, 50, arrow=tk.LAST)
+        self.canvas.create_line(20, CANVAS_HEIGHT/2, 20, 50, arrow="last")
         self.canvas.create_text(20, 40, text="z", font=("Helvetica", 12))
         
         # Iman Superior (Pol Nord)
@@ -193,6 +238,7 @@ class SternGerlachApp:
         self.canvas.create_line(start_x, start_y, SCREEN_X, end_y_down, 
                                 width=width_down, fill="#6666ff", tags="trajectory")
 
+    @instrumentar('SternGerlachApp.run_simulation')
     def run_simulation(self):
         try:
             n_sims = int(self.n_sim_var.get())
@@ -200,24 +246,109 @@ class SternGerlachApp:
         except ValueError:
             return
 
-        # Fem 'n' mesures. El resultat és +1 (up) o -1 (down).
-        # np.random.choice és molt eficient per a això.
-        outcomes = np.random.choice([1, -1], size=n_sims, p=[self.prob_up, self.prob_down])
-        
-        # Càlcul de les estadístiques de la simulació
-        sim_mean = np.mean(outcomes)
-        sim_std = np.std(outcomes)
-        
-        count_up = np.sum(outcomes == 1)
-        count_down = n_sims - count_up
+        comptar('trets', n_sims)
+        comptar('mostres_aleatories', 1)
+        sim_mean, sim_std, count_up, count_down = simular_stern_gerlach(self.prob_up, n_sims, self.rng)
         
         # Actualitzar labels de la simulació
         self.sim_mean_label.config(text=f"Mitjana (sim) = {sim_mean:.4f}")
         self.sim_std_label.config(text=f"Desviació (sim) = {sim_std:.4f}")
         self.sim_counts_label.config(text=f"Comptes: ↑={count_up}, ↓={count_down}")
 
+        # Error estàndard de la mitjana respecte del valor teòric ⟨σ_z⟩
+        exp_val, std_dev = valors_teorics(self.prob_up)
+        std_err = std_dev / np.sqrt(n_sims)
+        if std_err > 0:
+            self.sim_error_label.config(
+                text=f"Error estàndard = {std_err:.2e} (desviació: {(sim_mean - exp_val) / std_err:+.2f} σ)")
+        else:
+            self.sim_error_label.config(text=f"Error estàndard = 0 (desviació: {sim_mean - exp_val:+.2e})")
+
+    def run_spatial_simulation(self):
+        try:
+            n_sims = int(self.n_sim_var.get())
+            if n_sims <= 0: return
+        except ValueError:
+            return
+
+        # Una sola execució alhora: dues cadenes d'after barrejarien els histogrames
+        if self.spatial_after is not None:
+            self.master.after_cancel(self.spatial_after)
+            self.spatial_after = None
+        self.spatial_button.config(state="disabled")
+
+        # Els lots es processen d'un en un amb 'after' perquè la finestra
+        # respongui i l'histograma creixi a mesura que arriben àtoms
+        self.spatial_batches = histograma_per_lots(self.prob_up, n_sims, bins=FRONT_BINS, rng=self.rng)
+        self.spatial_scale = 150 / desviacio_pantalla()
+        self.draw_spatial_step()
+
+    def draw_spatial_step(self):
+        self.spatial_after = None
+        try:
+            self.draw_spatial_batch()
+        finally:
+            # Si no queda cap lot programat (final o error), el botó torna a funcionar
+            if self.spatial_after is None:
+                self.spatial_button.config(state="normal")
+
+    def draw_spatial_batch(self):
+        try:
+            done, hist, edges_y, edges_z = next(self.spatial_batches)
+        except StopIteration:
+            return
+
+        self.draw_front_view(hist)
+
+        # Perfil d'impactes al llarg de z (sumant en y), dibuixat a la pantalla
+        self.canvas.delete("hits")
+        profile = hist.sum(axis=0)
+        peak = max(profile.max(), 1)
+        centers = (edges_z[:-1] + edges_z[1:]) / 2
+        for z, count in zip(centers, profile):
+            if count == 0:
+                continue
+            y = CANVAS_HEIGHT / 2 - z * self.spatial_scale
+            length = 45 * count / peak
+            self.canvas.create_line(SCREEN_X + 2, y, SCREEN_X + 2 + length, y,
+                                    width=3, fill="#ff6666" if z > 0 else "#6666ff", tags="hits")
+
+        self.spatial_label.config(text=f"Àtoms a la pantalla: {done}")
+        self.spatial_after = self.master.after(1, self.draw_spatial_step)
+
+    def draw_front_view(self, hist):
+        """Histograma 2D a la vista frontal: y en horitzontal, z en vertical (amunt a dalt)"""
+        # L'eix z de l'histograma va de -2 a +2 desviacions, com el perfil lateral,
+        # així que en ampliar cada fila fins a omplir l'alçada del canvas les dues vistes coincideixen.
+        # L'arrel quadrada fa visibles les cues del feix.
+        n_y, n_z = hist.shape
+        levels = 255 - np.round(255 * np.sqrt(hist / max(hist.max(), 1))).astype(int)
+        rows = GRAY_PALETTE[levels.T[::-1]]
+        self.front_cells.put(" ".join("{" + " ".join(row) + "}" for row in rows))
+        self.front_image = self.front_cells.zoom(FRONT_ZOOM, CANVAS_HEIGHT // n_z)
+        self.front_canvas.itemconfig(self.front_item, image=self.front_image)
+
+    def run_cascade(self):
+        try:
+            n_sims = int(self.n_sim_var.get())
+            stages = llegir_etapes(self.cascade_var.get())
+            if n_sims <= 0 or not stages: return
+        except ValueError:
+            return
+
+        counts = simular_cascada(self.c_up, self.c_down, stages, n_sims, self.rng)
+        expected = valors_esperats_cascada(self.c_up, self.c_down, stages)
+
+        lines = []
+        for k, (stage, (up, down), exp_val) in enumerate(zip(stages, counts, expected)):
+            blocked = f" (bloquejat: {stage.bloqueja})" if stage.bloqueja else ""
+            lines.append(f"{k+1}. θ={stage.theta:.0f}°, φ={stage.phi:.0f}°{blocked}")
+            lines.append(f"   +: {up}  –: {down}  ⟨σ_n⟩={exp_val:.3f}")
+        self.cascade_label.config(text="\n".join(lines))
+
 
 if __name__ == "__main__":
+    import tkinter as tk
     root = tk.Tk()
     app = SternGerlachApp(root)
     root.mainloop()
\ No newline at end of file
@@ -0,0 +1,90 @@
+"""Nombres aleatoris reproduïbles per a les simulacions de Monte Carlo.
+
+Totes les funcions de simulació accepten un paràmetre rng, que pot ser un
+np.random.Generator, una llavor entera, una np.random.SeedSequence o None
+(entropia nova del sistema operatiu); np.random.default_rng el converteix
+en un Generator.
+
+Per repartir una feina gran, executar_per_blocs la divideix en blocs de
+mida fixa i dona al bloc k el flux fill k de la SeedSequence arrel. Així el
+resultat agregat depèn només de (llavor, N, mida_bloc), i no del nombre de
+processos ni de l'ordre en què acaben els blocs.
+"""
+import random
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+
+def sequencia_llavor(llavor=None):
+    """SeedSequence a partir d'una llavor entera, una SeedSequence o None"""
+    if isinstance(llavor, np.random.SeedSequence):
+        return llavor
+    return np.random.SeedSequence(llavor)
+
+
+def llavor_fill(llavor, index):
+    """Flux fill número index de llavor, sense dependre de quants se n'han creat abans.
+
+    És el mateix que el fill index de SeedSequence.spawn, però sense estat:
+    llavor_fill(s, 3) sempre dona el mateix, es cridi on es cridi.
+    """
+    arrel = sequencia_llavor(llavor)
+    return np.random.SeedSequence(arrel.entropy, spawn_key=arrel.spawn_key + (index,),
+                                  pool_size=arrel.pool_size)
+
+
+def generadors(llavor, n):
+    """n Generators independents, un per treballador o per bloc"""
+    return [np.random.default_rng(llavor_fill(llavor, k)) for k in range(n)]
+
+
+def aleatori_python(rng=None):
+    """Font amb la interfície del mòdul random per als bucles escalars.
+
+    Amb rng=None és el mòdul random global, com fins ara. Amb un Generator
+    (o una llavor) és un random.Random sembrat a partir d'ell: tan ràpid com
+    random.random() i reproduïble.
+    """
+    if rng is None:
+        return random
+    return random.Random(int(np.random.default_rng(rng).integers(2**63)))
+
+
+def _executar_bloc(argument):
+    funcio, n, llavor = argument
+    return funcio(n, np.random.default_rng(llavor))
+
+
+def executar_per_blocs(funcio, N, llavor=None, mida_bloc=10**6, processos=None):
+    """Suma funcio(n, rng) sobre N assajos repartits en blocs de mida_bloc.
+
+    funcio ha de retornar comptes (un nombre, un array, una tupla de
+    nombres o un diccionari de comptes) i, si processos != 1, ser
+    serialitzable amb pickle (una funció de mòdul o un functools.partial).
+    Cada bloc té el seu flux fill de llavor, de manera que el total és
+    idèntic bit a bit per a qualsevol nombre de processos. Amb llavor=None
+    es fa servir entropia nova; per poder repetir l'execució, passeu una
+    SeedSequence i guardeu-ne .entropy.
+    """
+    arrel = sequencia_llavor(llavor)
+    blocs = [(funcio, min(mida_bloc, N - inici), llavor_fill(arrel, k))
+             for k, inici in enumerate(range(0, N, mida_bloc))]
+    if processos == 1 or len(blocs) <= 1:
+        parcials = [_executar_bloc(b) for b in blocs]
+    else:
+        with ProcessPoolExecutor(max_workers=processos) as pool:
+            parcials = list(pool.map(_executar_bloc, blocs))
+    if not parcials:
+        return np.asarray(0)
+    # Suma en l'ordre dels blocs, perquè també els totals en coma flotant coincideixin
+    if isinstance(parcials[0], dict):
+        total = {}
+        for parcial in parcials:
+            for clau, valor in parcial.items():
+                total[clau] = total.get(clau, 0) + valor
+        return total
+    total = np.asarray(parcials[0])
+    for parcial in parcials[1:]:
+        total = total + np.asarray(parcial)
+    return total
@@ -0,0 +1,233 @@
+"""Benchmarks dels camins calents dels simuladors.
+
+Mesura temps, rendiment (cel·les/s, trets/s, redibuixos/s) i memòria
+màxima de cada simulador per a diverses mides, i guarda els resultats en
+un historial JSON Lines amb el commit de git. En acabar compara cada mesura
+amb l'última d'un commit anterior i marca les regressions.
+
+El redibuix del visualitzador d'entrellaçament es mesura sobre el backend
+Agg, sense finestra. run_simulation necessita una pantalla Tk (per exemple
+amb xvfb-run); si no n'hi ha, només es mesura el seu nucli,
+simular_stern_gerlach.
+
+Ús:
+    python benchmark.py                    # totes les mides
+    python benchmark.py --rapid            # només les mides petites
+    python benchmark.py -k canal -k bis    # només els benchmarks amb aquests noms
+"""
+import argparse
+import json
+import os
+import subprocess
+import time
+import tracemalloc
+
+import numpy as np
+
+import canal_binari
+import Error_detection
+import mesura_conjunta
+import simulacio_sg
+from execucio_lots import DIRECTORI, carregar_script
+
+HISTORIAL = os.path.join(DIRECTORI, 'benchmarks_historial.jsonl')
+
+
+def mesurar(funcio, repeticions=3):
+    """Millor temps de paret de funcio() i memòria màxima (bytes) d'una execució"""
+    # La primera execució, amb tracemalloc, serveix també d'escalfament
+    tracemalloc.start()
+    funcio()
+    _, pic = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    temps = []
+    for _ in range(repeticions):
+        inici = time.perf_counter()
+        funcio()
+        temps.append(time.perf_counter() - inici)
+    return min(temps), pic
+
+
+# --- Preparació de cada benchmark: mida -> (funció sense arguments, unitats de feina) ---
+
+def _bis(mida):
+    eps = np.linspace(0.0025, 0.5, mida)
+    eps0, eps1 = np.meshgrid(eps, eps)
+
+    def executar():
+        for e0, e1 in zip(eps0.ravel(), eps1.ravel()):
+            canal_binari.bis(0.0, 1.0, canal_binari.derI, e0, e1)
+    return executar, mida * mida
+
+
+def _graella_capacitat(mida):
+    eps = np.linspace(0.0025, 0.5, mida)
+    eps0, eps1 = np.meshgrid(eps, eps)
+
+    def executar():
+        roots = canal_binari.bis_vectorial(0.0, 1.0, canal_binari.derI, eps0, eps1)
+        canal_binari.I(roots, eps0, eps1)
+    return executar, mida * mida
+
+
+def _simular_canal(mida):
+    return (lambda: Error_detection.simular_canal(0.1, mida)), mida
+
+
+def _simular_canal_vectorial(mida):
+    return (lambda: Error_detection.simular_canal_vectorial(0.1, mida)), mida
+
+
+def _simular_shannon(mida):
+    return (lambda: Error_detection.simular_shannon_asimmetric(0.1, mida)), mida
+
+
+def _simular_shannon_vectorial(mida):
+    return (lambda: Error_detection.simular_shannon_vectorial(0.1, mida)), mida
+
+
+def _simular_medida_quantica(mida):
+    estat = np.array([1, 0, 0, 1]) / np.sqrt(2)
+    return (lambda: mesura_conjunta.simular_medida_quantica(estat, np.pi / 4, mida)), mida
+
+
+def _simular_stern_gerlach(mida):
+    return (lambda: simulacio_sg.simular_stern_gerlach(0.5, mida)), mida
+
+
+_arrel_tk = []
+
+
+def _tk():
+    """Arrel Tk compartida, o None si no hi ha pantalla"""
+    if not _arrel_tk:
+        import tkinter as tk
+        try:
+            arrel = tk.Tk()
+            arrel.withdraw()
+        except tk.TclError:
+            arrel = None
+        _arrel_tk.append(arrel)
+    return _arrel_tk[0]
+
+
+def _run_simulation(mida):
+    arrel = _tk()
+    if arrel is None:
+        return None
+    import tkinter as tk
+    modul = carregar_script('stern_gerlach')
+    app = modul.SternGerlachApp(tk.Toplevel(arrel))
+    app.n_sim_var.set(str(mida))
+    return app.run_simulation, mida
+
+
+def _update_plots(mida):
+    # Sense finestra (master=None) la figura és sobre Agg i update_plots
+    # redibuixa de seguida (blit sobre el fons guardat), sense cap 'after' pendent
+    modul = carregar_script('visualitzador')
+    app = modul.EntanglementVisualizer(None)
+    valors = np.linspace(0, app.t_max, mida)
+
+    def executar():
+        for t in valors:
+            app.update_plots(t)
+    return executar, mida
+
+
+# (nom, preparació, mides completes, mides ràpides, unitats)
+BENCHMARKS = [
+    ('bis', _bis, [20, 50], [10], 'cel·les/s'),
+    ('graella_capacitat', _graella_capacitat, [200, 500, 1000, 2000], [100, 200], 'cel·les/s'),
+    ('simular_canal', _simular_canal, [10**3, 10**4, 10**5], [10**3, 10**4], 'assajos/s'),
+    ('simular_canal_vectorial', _simular_canal_vectorial, [10**5, 10**7, 10**9], [10**5, 10**7], 'assajos/s'),
+    ('simular_shannon_asimmetric', _simular_shannon, [10**3, 10**4, 10**5], [10**3, 10**4], 'símbols/s'),
+    ('simular_shannon_vectorial', _simular_shannon_vectorial, [10**5, 10**6, 10**7], [10**5], 'símbols/s'),
+    ('simular_medida_quantica', _simular_medida_quantica, [10**3, 10**5, 10**7], [10**3, 10**5], 'trets/s'),
+    ('simular_stern_gerlach', _simular_stern_gerlach, [10**3, 10**6, 10**8], [10**3, 10**6], 'trets/s'),
+    ('run_simulation', _run_simulation, [10**3, 10**6, 10**9], [10**3], 'trets/s'),
+    ('update_plots', _update_plots, [10, 50], [10], 'redibuixos/s'),
+]
+
+
+def commit_actual():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=DIRECTORI,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'desconegut'
+
+
+def llegir_historial(fitxer):
+    if not os.path.exists(fitxer):
+        return []
+    with open(fitxer, encoding='utf-8') as f:
+        return [json.loads(linia) for linia in f if linia.strip()]
+
+
+def executar_benchmarks(noms=None, rapid=False, repeticions=3):
+    """Executa els benchmarks i retorna una fila per (benchmark, mida)"""
+    resultats = []
+    for nom, preparar, mides, mides_rapides, unitats in BENCHMARKS:
+        if noms and not any(n in nom for n in noms):
+            continue
+        for mida in (mides_rapides if rapid else mides):
+            preparat = preparar(mida)
+            if preparat is None:
+                print(f"{nom}: sense pantalla, se salta")
+                break
+            funcio, feina = preparat
+            temps, pic = mesurar(funcio, repeticions)
+            resultats.append({'nom': nom, 'mida': mida, 'temps': temps,
+                              'rendiment': feina / temps, 'unitats': unitats,
+                              'memoria_pic': pic})
+    return resultats
+
+
+def comparar(resultats, historial, commit, llindar):
+    """Marca les mesures més lentes que llindar vegades l'última d'un altre commit"""
+    anteriors = {}
+    for fila in historial:
+        if fila['commit'] != commit:
+            anteriors[(fila['nom'], fila['mida'])] = fila
+    for fila in resultats:
+        anterior = anteriors.get((fila['nom'], fila['mida']))
+        fila['anterior'] = anterior['temps'] if anterior else None
+        fila['regressio'] = bool(anterior and fila['temps'] > llindar * anterior['temps'])
+    return resultats
+
+
+def mostrar(resultats):
+    print(f"{'benchmark':<28}{'mida':>12}{'temps (s)':>12}{'rendiment':>26}{'memòria':>12}{'abans (s)':>12}")
+    for fila in resultats:
+        abans = f"{fila['anterior']:.4g}" if fila['anterior'] is not None else '-'
+        marca = '  REGRESSIÓ' if fila['regressio'] else ''
+        print(f"{fila['nom']:<28}{fila['mida']:>12}{fila['temps']:>12.4g}"
+              f"{fila['rendiment']:>14.3g} {fila['unitats']:<11}"
+              f"{fila['memoria_pic'] / 2**20:>9.1f} MB{abans:>12}{marca}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks dels simuladors")
+    parser.add_argument('-k', dest='noms', action='append', help="executa només els benchmarks que continguin aquest nom")
+    parser.add_argument('--rapid', action='store_true', help="només les mides petites")
+    parser.add_argument('--repeticions', type=int, default=3)
+    parser.add_argument('--historial', default=HISTORIAL, help="fitxer JSON Lines on s'acumulen els resultats")
+    parser.add_argument('--llindar', type=float, default=1.2, help="factor de temps a partir del qual hi ha regressió")
+    parser.add_argument('--no-desar', action='store_true', help="no afegeix els resultats a l'historial")
+    args = parser.parse_args()
+
+    commit = commit_actual()
+    resultats = executar_benchmarks(args.noms, args.rapid, args.repeticions)
+    comparar(resultats, llegir_historial(args.historial), commit, args.llindar)
+    mostrar(resultats)
+
+    if not args.no_desar:
+        with open(args.historial, 'a', encoding='utf-8') as f:
+            for fila in resultats:
+                registre = {k: v for k, v in fila.items() if k not in ('anterior', 'regressio')}
+                f.write(json.dumps(dict(registre, commit=commit, data=time.strftime('%Y-%m-%dT%H:%M:%S'))) + '\n')
+
+
+if __name__ == "__main__":
+    main()
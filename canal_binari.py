@@ -0,0 +1,70 @@
+"""Informació mútua del canal binari asimètric i recerca de l'entrada òptima
+per bisecció sobre la seva derivada."""
+import numpy as np
+
+from instrumentacio import comptar, instrumentar
+
+def I(p, eps_0,eps_1):
+    # Añadimos un valor minúsculo para evitar log2(0)
+    p = np.clip(p, 1e-10, 1-1e-10)
+    eps_0 = np.clip(eps_0, 1e-10, 1-1e-10)
+    eps_1 = np.clip(eps_1, 1e-10, 1-1e-10)
+
+    term1 = -(p*(1-eps_0)+ (1 - p) * eps_1) * np.log2(p*(1-eps_0) + (1 - p) * eps_1)
+    term2 = -(p*eps_0+(1 - p) * (1 - eps_1)) * np.log2(p*eps_0+(1 - p) * (1 - eps_1))
+    term3 = (1 - p) * eps_1 * np.log2(eps_1) + (1 - p) * (1 - eps_1) * np.log2(1 - eps_1)
+    term4 = p*(1-eps_0) * np.log2(1-eps_0) + p*eps_0 * np.log2(eps_0)
+    return term1 + term2 + term3 + term4
+def derI(p,eps_0,eps_1):
+    p = np.clip(p, 1e-10, 1-1e-10)
+    eps_0 = np.clip(eps_0, 1e-10, 1-1e-10)
+    eps_1 = np.clip(eps_1, 1e-10, 1-1e-10)
+
+    term1=(1-eps_0-eps_1)*np.log2((p*eps_0+(1-p)*(1-eps_1))/(p*(1-eps_0)+(1-p)*eps_1))
+    term2=(1-eps_0)*np.log2(1-eps_0)+eps_0*np.log2(eps_0)
+    term3=-eps_1*np.log2(eps_1)-(1-eps_1)*np.log2(1-eps_1)
+    return term1 + term2 + term3
+
+@instrumentar('bis')
+def bis(a,b,derI,eps_0,eps_1):
+    epsilon = b-a
+    iteracions = 0
+    while epsilon>0.02:
+        iteracions += 1
+        c = (a+b)/2
+        epsilon = b-a
+        if derI(c,eps_0,eps_1)*derI(a,eps_0,eps_1) < 0:
+            b=c
+        if derI(c,eps_0,eps_1)*derI(b,eps_0,eps_1)<0:
+            a=c
+        if derI(c,eps_0,eps_1)==0:
+            break
+    # Cada iteració avalua derI cinc vegades
+    comptar('iteracions', iteracions)
+    comptar('avaluacions_derI', 5 * iteracions)
+    return c
+
+def bis_vectorial(a, b, derI, eps_0, eps_1, tol=1e-10, max_iter=100):
+    """Bisecció sobre tota la malla eps_0/eps_1 alhora.
+
+    Cada cel·la té el seu interval [a, b]; a cada iteració es parteixen tots
+    els intervals per la meitat amb una sola avaluació vectoritzada de derI.
+    Para quan tots els intervals són més petits que tol o després de max_iter
+    iteracions.
+    """
+    eps_0, eps_1 = np.broadcast_arrays(np.asarray(eps_0, dtype=float),
+                                       np.asarray(eps_1, dtype=float))
+    a = np.full(eps_0.shape, a, dtype=float)
+    b = np.full(eps_0.shape, b, dtype=float)
+    f_a = derI(a, eps_0, eps_1)
+    for _ in range(max_iter):
+        c = (a + b) / 2
+        if np.max(b - a) <= tol:
+            break
+        f_c = derI(c, eps_0, eps_1)
+        # Si derI(c) té el mateix signe que derI(a), l'arrel és a [c, b]
+        mateix_signe = f_c * f_a > 0
+        a = np.where(mateix_signe, c, a)
+        f_a = np.where(mateix_signe, f_c, f_a)
+        b = np.where(mateix_signe, b, c)
+    return (a + b) / 2
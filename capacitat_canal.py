@@ -0,0 +1,108 @@
+import numpy as np
+
+
+def _xlog2x(x):
+    """x*log2(x) amb el conveni 0*log2(0) = 0"""
+    x = np.asarray(x, dtype=float)
+    return np.where(x > 0, x * np.log2(np.where(x > 0, x, 1.0)), 0.0)
+
+
+def entropia_binaria(eps):
+    """Entropia binària H(eps) en bits"""
+    return -_xlog2x(eps) - _xlog2x(1 - np.asarray(eps, dtype=float))
+
+
+def capacitat_binaria(eps_0, eps_1):
+    """Capacitat del canal binari asimètric en forma tancada.
+
+    El canal és el de canal_binari: l'entrada 0 (probabilitat p)
+    es canvia amb probabilitat eps_0 i l'entrada 1 amb probabilitat eps_1.
+    Accepta arrays de qualsevol forma (es fa broadcasting) i retorna
+    (p_optima, C) amb la mateixa forma.
+    """
+    eps_0, eps_1 = np.broadcast_arrays(np.asarray(eps_0, dtype=float),
+                                       np.asarray(eps_1, dtype=float))
+    h0 = entropia_binaria(eps_0)
+    h1 = entropia_binaria(eps_1)
+    k = 1 - eps_0 - eps_1
+    # Si k = 0 les dues files de la matriu són iguals i C = 0
+    degenerat = np.abs(k) < 1e-12
+    k_segur = np.where(degenerat, 1.0, k)
+
+    # Condició d'optimalitat: sum_j W_ij c_j = -H(W_i), amb C = log2(sum_j 2^c_j)
+    c0 = -((1 - eps_1) * h0 - eps_0 * h1) / k_segur
+    c1 = -((1 - eps_0) * h1 - eps_1 * h0) / k_segur
+    C = np.logaddexp2(c0, c1)
+
+    # Distribució de sortida òptima q i entrada p tal que p*W = q
+    q0 = np.exp2(c0 - C)
+    p = np.clip((q0 - eps_1) / k_segur, 0.0, 1.0)
+
+    C = np.where(degenerat, 0.0, C)
+    p = np.where(degenerat, 0.5, p)
+    return p, C
+
+
+def _divergencies(W, q):
+    """D(W_i || q) en bits per a cada fila i de cada matriu del lot"""
+    q = q[..., None, :]
+    log_ratio = np.log2(np.where(W > 0, W, 1.0) / np.where(W > 0, q, 1.0))
+    return np.sum(np.where(W > 0, W * log_ratio, 0.0), axis=-1)
+
+
+def blahut_arimoto(W, tol=1e-9, max_iter=10000, p0=None):
+    """Capacitat d'un o molts canals discrets sense memòria (Blahut-Arimoto).
+
+    W té forma (..., N, M): una matriu de transició N x M (files = entrades,
+    columnes = sortides) o un lot de matrius apilades als primers eixos.
+    Cada canal s'atura quan la diferència entre la cota superior
+    max_i D(W_i||q) i la cota inferior log2 sum_i p_i 2^D(W_i||q) és menor
+    que tol; els canals ja convergits deixen d'iterar.
+
+    Retorna (p, C_inf, C_sup): la distribució d'entrada òptima i les cotes
+    inferior i superior de la capacitat, en bits.
+    """
+    W = np.asarray(W, dtype=float)
+    forma_lot = W.shape[:-2]
+    N, M = W.shape[-2:]
+    W = W.reshape(-1, N, M)
+    n_canals = W.shape[0]
+
+    if p0 is None:
+        p = np.full((n_canals, N), 1.0 / N)
+    else:
+        p = np.broadcast_to(np.asarray(p0, dtype=float), forma_lot + (N,))
+        p = p.reshape(n_canals, N).copy()
+    C_inf = np.zeros(n_canals)
+    C_sup = np.full(n_canals, np.inf)
+
+    actius = np.arange(n_canals)
+    for _ in range(max_iter):
+        W_a = W[actius]
+        p_a = p[actius]
+        D = _divergencies(W_a, np.einsum('bn,bnm->bm', p_a, W_a))
+        # Normalitzem amb el màxim per evitar desbordaments a 2^D
+        D_max = np.max(D, axis=-1)
+        pes = p_a * np.exp2(D - D_max[:, None])
+        suma = np.sum(pes, axis=-1)
+
+        C_inf[actius] = D_max + np.log2(suma)
+        C_sup[actius] = D_max
+        p[actius] = pes / suma[:, None]
+
+        convergits = C_sup[actius] - C_inf[actius] < tol
+        actius = actius[~convergits]
+        if actius.size == 0:
+            break
+
+    return (p.reshape(forma_lot + (N,)),
+            C_inf.reshape(forma_lot),
+            C_sup.reshape(forma_lot))
+
+
+def matriu_binaria(eps_0, eps_1):
+    """Matrius de transició 2x2 del canal binari asimètric, apilades"""
+    eps_0, eps_1 = np.broadcast_arrays(np.asarray(eps_0, dtype=float),
+                                       np.asarray(eps_1, dtype=float))
+    return np.stack([np.stack([1 - eps_0, eps_0], axis=-1),
+                     np.stack([eps_1, 1 - eps_1], axis=-1)], axis=-2)
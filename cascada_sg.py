@@ -0,0 +1,103 @@
+"""Cascades d'aparells de Stern-Gerlach (espí 1/2).
+
+Cada etapa és un analitzador orientat segons (θ, φ) amb dos ports de
+sortida (+ i -); qualsevol port es pot bloquejar. Després de cada etapa
+l'espí d'un feix queda en l'estat propi del port per on surt, de manera
+que n'hi ha prou de seguir els feixos (un estat i un nombre de partícules
+per port) en lloc de cada partícula.
+"""
+from collections import namedtuple
+
+import numpy as np
+
+Analitzador = namedtuple('Analitzador', ['theta', 'phi', 'bloqueja'])
+Analitzador.__new__.__defaults__ = (0.0, 0.0, '')
+
+EIXOS = {'z': (0.0, 0.0), 'x': (90.0, 0.0), 'y': (90.0, 90.0)}
+
+
+def estats_propis(theta, phi):
+    """Vectors |+n⟩ i |-n⟩ (files) en la base |z,+⟩, |z,–⟩, angles en graus"""
+    t, f = np.radians(theta) / 2, np.radians(phi)
+    return np.array([[np.cos(t), np.exp(1j * f) * np.sin(t)],
+                     [np.sin(t), -np.exp(1j * f) * np.cos(t)]], dtype=complex)
+
+
+def llegir_etapes(text):
+    """Llegeix una cascada com "z!- x!- z".
+
+    Cada etapa és un eix (x, y, z) o "θ/φ" en graus; "!+" o "!-" al final
+    bloqueja aquest port.
+    """
+    etapes = []
+    for token in text.replace(',', ' ').replace(';', ' ').split():
+        orientacio, _, bloqueja = token.partition('!')
+        if bloqueja not in ('', '+', '-', '+-', '-+'):
+            raise ValueError(f"Port bloquejat no vàlid a '{token}'")
+        if orientacio.lower() in EIXOS:
+            theta, phi = EIXOS[orientacio.lower()]
+        else:
+            theta, _, phi = orientacio.partition('/')
+            theta, phi = float(theta), float(phi or 0.0)
+        etapes.append(Analitzador(theta, phi, bloqueja))
+    return etapes
+
+
+def _feixos_inicials(c_up, c_down):
+    estat = np.array([c_up, c_down], dtype=complex)
+    return estat[None, :] / np.linalg.norm(estat)
+
+
+def _propagar(estats, etapa):
+    """Probabilitats de cada feix (F, 2) de sortir per cada port de l'etapa"""
+    base = estats_propis(etapa.theta, etapa.phi)
+    # Projecció de tots els feixos sobre els dos estats propis alhora
+    amplituds = np.einsum('pi,fi->fp', base.conj(), estats)
+    return np.abs(amplituds)**2, base
+
+
+def probabilitats_cascada(c_up, c_down, etapes):
+    """Probabilitats exactes d'arribar a cada port, forma (n_etapes, 2).
+
+    Les probabilitats són respecte de les partícules que entren a la
+    primera etapa; els ports bloquejats absorbeixen el que hi arriba.
+    """
+    estats = _feixos_inicials(c_up, c_down)
+    pesos = np.ones(1)
+    resultat = np.zeros((len(etapes), 2))
+    for k, etapa in enumerate(etapes):
+        p, base = _propagar(estats, etapa)
+        per_port = pesos @ p
+        resultat[k] = per_port
+        oberts = [port for port, signe in enumerate('+-') if signe not in etapa.bloqueja]
+        estats, pesos = base[oberts], per_port[oberts]
+    return resultat
+
+
+def simular_cascada(c_up, c_down, etapes, n_particules, rng=None):
+    """Envia n_particules per la cascada; retorna els comptes per port (n_etapes, 2).
+
+    A cada etapa, el nombre de partícules de cada feix que surten pel port +
+    és binomial amb la probabilitat exacta de la projecció, així que el cost
+    no depèn de n_particules.
+    """
+    rng = np.random.default_rng(rng)
+    estats = _feixos_inicials(c_up, c_down)
+    comptes_feixos = np.array([n_particules], dtype=np.int64)
+    comptes = np.zeros((len(etapes), 2), dtype=np.int64)
+    for k, etapa in enumerate(etapes):
+        p, base = _propagar(estats, etapa)
+        amunt = rng.binomial(comptes_feixos, np.clip(p[:, 0] / p.sum(axis=1), 0.0, 1.0))
+        per_port = np.array([amunt.sum(), (comptes_feixos - amunt).sum()])
+        comptes[k] = per_port
+        oberts = [port for port, signe in enumerate('+-') if signe not in etapa.bloqueja]
+        estats, comptes_feixos = base[oberts], per_port[oberts]
+    return comptes
+
+
+def valors_esperats_cascada(c_up, c_down, etapes):
+    """⟨σ_n⟩ a cada etapa per a les partícules que hi arriben (nan si no n'arriba cap)"""
+    p = probabilitats_cascada(c_up, c_down, etapes)
+    total = p.sum(axis=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(total > 0, (p[:, 0] - p[:, 1]) / total, np.nan)
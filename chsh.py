@@ -0,0 +1,77 @@
+import numpy as np
+
+# Angles estàndard (a, a', b, b') de la nota de visualizar_experimento
+ANGLES_ESTANDARD = np.radians([0.0, 90.0, 45.0, 135.0])
+
+
+def _normalitzar(estats):
+    """Estats de forma (K, 4) normalitzats, com a tensors (K, 2, 2)"""
+    estats = np.atleast_2d(np.asarray(estats, dtype=complex))
+    estats = estats / np.linalg.norm(estats, axis=-1, keepdims=True)
+    return estats.reshape(-1, 2, 2)
+
+
+def observable(theta):
+    """σ(θ) = cos θ σ_z + sin θ σ_x, de forma (..., 2, 2)"""
+    theta = np.asarray(theta, dtype=float)
+    c, s = np.cos(theta), np.sin(theta)
+    return np.stack([np.stack([c, s], axis=-1),
+                     np.stack([s, -c], axis=-1)], axis=-2)
+
+
+def correladors(estats, a, b):
+    """E(a, b) = ⟨σ(a)⊗σ(b)⟩ per a K estats i L parells d'angles, forma (K, L)"""
+    psi = _normalitzar(estats)
+    A = observable(np.atleast_1d(a))
+    B = observable(np.atleast_1d(b))
+    E = np.einsum('kij,lia,ljb,kab->kl', psi.conj(), A, B, psi, optimize=True)
+    return E.real
+
+
+def probabilitats_conjuntes(estats, a, b):
+    """P(++), P(+-), P(-+), P(--) per a K estats i L parells d'angles, forma (K, L, 4)"""
+    psi = _normalitzar(estats)
+
+    def base(theta):
+        # Vectors propis de σ(θ) amb valor propi +1 i -1, forma (L, 2, 2)
+        theta = np.atleast_1d(np.asarray(theta, dtype=float)) / 2
+        c, s = np.cos(theta), np.sin(theta)
+        return np.stack([np.stack([c, s], axis=-1),
+                         np.stack([s, -c], axis=-1)], axis=-2)
+
+    amplituds = np.einsum('lia,ljb,kab->klij', base(a), base(b), psi, optimize=True)
+    return (np.abs(amplituds)**2).reshape(psi.shape[0], -1, 4)
+
+
+def valor_S(estats, angles=ANGLES_ESTANDARD):
+    """S = E(a,b) - E(a,b') + E(a',b) + E(a',b') exacte.
+
+    angles té forma (L, 4) amb les columnes (a, a', b, b'), o (4,) per a un
+    sol joc d'angles. Retorna S de forma (K, L).
+    """
+    angles = np.atleast_2d(np.asarray(angles, dtype=float))
+    a, a2, b, b2 = angles.T
+    # Les quatre configuracions de cada joc d'angles en una sola contracció
+    E = correladors(estats, np.concatenate([a, a, a2, a2]), np.concatenate([b, b2, b, b2]))
+    E = E.reshape(E.shape[0], 4, -1)
+    return E[:, 0] - E[:, 1] + E[:, 2] + E[:, 3]
+
+
+def valor_S_mostrejat(estats, angles=ANGLES_ESTANDARD, n_simulaciones=10000, rng=None):
+    """Estimació de S amb n_simulaciones trets per configuració.
+
+    Retorna (S, error) de forma (K, L): l'estimació i la seva desviació
+    estàndard, sumant les variàncies (1 - E²)/n dels quatre correladors.
+    """
+    rng = np.random.default_rng(rng)
+    angles = np.atleast_2d(np.asarray(angles, dtype=float))
+    a, a2, b, b2 = angles.T
+    probs = probabilitats_conjuntes(estats, np.concatenate([a, a, a2, a2]),
+                                    np.concatenate([b, b2, b, b2]))
+    probs = probs / probs.sum(axis=-1, keepdims=True)
+    comptes = rng.multinomial(n_simulaciones, probs)
+    E = (comptes[..., 0] - comptes[..., 1] - comptes[..., 2] + comptes[..., 3]) / n_simulaciones
+    E = E.reshape(E.shape[0], 4, -1)
+    S = E[:, 0] - E[:, 1] + E[:, 2] + E[:, 3]
+    error = np.sqrt(np.sum(1 - E**2, axis=1) / n_simulaciones)
+    return S, error
@@ -0,0 +1,258 @@
+"""Simulació de codis de bloc lineals binaris sobre un canal binari simètric.
+
+Un codi es defineix amb la seva matriu generadora G (k x n) o de
+comprovació de paritat H (r x n) sobre GF(2). Com que el codi és lineal i
+el canal simètric, n'hi ha prou d'enviar la paraula zero: el patró d'error
+és la paraula rebuda.
+
+Els blocs es guarden per plans de bits: el pla b és un array de uint64 on
+el bit t de la paraula w és el bit b del bloc 64*w + t. Les errades de
+Bernoulli, les síndromes i la descodificació amb la taula de síndromes es
+fan amb operacions bit a bit sobre 64 blocs alhora.
+"""
+from collections import namedtuple
+from itertools import combinations
+
+import numpy as np
+
+# La taula de síndromes té 2^r entrades i es construeix en Python: amb r = 20
+# ja triga uns segons, i cada bit més en dobla la memòria i el temps
+MAX_BITS_SINDROME = 20
+
+
+def _nucli_gf2(M):
+    """Base (files) del nucli de M sobre GF(2): tots els x amb M x = 0"""
+    M = np.array(M, dtype=np.uint8) % 2
+    files, n = M.shape
+    pivots = []
+    fila = 0
+    for col in range(n):
+        candidats = np.flatnonzero(M[fila:, col]) if fila < files else []
+        if len(candidats) == 0:
+            continue
+        p = fila + candidats[0]
+        M[[fila, p]] = M[[p, fila]]
+        for altra in np.flatnonzero(M[:, col]):
+            if altra != fila:
+                M[altra] ^= M[fila]
+        pivots.append(col)
+        fila += 1
+    lliures = [c for c in range(n) if c not in pivots]
+    base = np.zeros((len(lliures), n), dtype=np.uint8)
+    for k, c in enumerate(lliures):
+        base[k, c] = 1
+        for f, p in enumerate(pivots):
+            base[k, p] = M[f, c]
+    return base
+
+
+def _popcount(paraules):
+    if hasattr(np, 'bitwise_count'):
+        return int(np.bitwise_count(paraules).sum())
+    return int(np.unpackbits(paraules.view(np.uint8)).sum())
+
+
+def _enters_per_bloc(plans, n):
+    """Enter de cada bloc (bit b = pla b) a partir dels plans de bits, per als n primers blocs"""
+    valors = np.zeros(n, dtype=np.int64)
+    for b, pla in enumerate(plans):
+        # En little-endian el bit t de la paraula w queda a la posició 64*w + t
+        bits = np.unpackbits(pla.astype('<u8', copy=False).view(np.uint8), bitorder='little')[:n]
+        valors |= bits.astype(np.int64) << b
+    return valors
+
+
+class ResultatCodi(namedtuple('ResultatCodi', ['blocs', 'erronis', 'no_detectats', 'detectats',
+                                               'corregits', 'mal_corregits'])):
+    """Comptes de blocs: amb algun error, amb error de síndrome zero (no
+    detectat), amb síndrome no nul·la (detectat), descodificats a la paraula
+    enviada (corregit) i descodificats a una altra paraula (mal corregit)."""
+
+    def taxes(self):
+        """Cada compte dividit pel nombre de blocs"""
+        return {camp: getattr(self, camp) / self.blocs for camp in self._fields[1:]}
+
+
+class CodiLineal:
+    """Codi lineal binari [n, k] amb descodificació per taula de síndromes.
+
+    La taula dona, per a cada síndrome, el patró d'error de pes mínim (líder
+    de la classe). Si el líder no és únic (per exemple dos errors en un codi
+    de Hamming estès), el descodificador no corregeix: el bloc queda
+    detectat però no corregit.
+    """
+
+    def __init__(self, G=None, H=None, nom=''):
+        if (G is None) == (H is None):
+            raise ValueError("Cal donar G o H, però no totes dues")
+        if H is None:
+            G = np.array(G, dtype=np.uint8) % 2
+            H = _nucli_gf2(G)
+        else:
+            H = np.array(H, dtype=np.uint8).reshape(-1, np.shape(H)[-1]) % 2
+            G = _nucli_gf2(H)
+        self.G, self.H = G, H
+        self.n = H.shape[1]
+        self.k = G.shape[0]
+        self.r = H.shape[0]
+        self.nom = nom or f"[{self.n}, {self.k}]"
+        if self.n > 63:
+            raise ValueError("Com a màxim 63 bits per bloc")
+        if self.r > MAX_BITS_SINDROME:
+            raise ValueError(f"La síndrome té {self.r} bits: la taula de síndromes en admet com a màxim "
+                             f"{MAX_BITS_SINDROME} (2^{MAX_BITS_SINDROME} entrades)")
+        self._taula_sindromes()
+
+    def __repr__(self):
+        return f"CodiLineal({self.nom})"
+
+    def sindrome(self, patro):
+        """Síndrome (enter de r bits) d'un patró d'error (enter de n bits)"""
+        bits = (patro >> np.arange(self.n)) & 1
+        return int(((self.H @ bits) % 2) @ (1 << np.arange(self.r)))
+
+    def _taula_sindromes(self):
+        n_sindromes = 1 << self.r
+        self.lider = np.zeros(n_sindromes, dtype=np.int64)
+        self.pes_lider = np.full(n_sindromes, -1)
+        self.lider_unic = np.zeros(n_sindromes, dtype=bool)
+        columnes = [self.sindrome(1 << b) for b in range(self.n)]
+        pendents = n_sindromes
+        for pes in range(self.n + 1):
+            for bits in combinations(range(self.n), pes):
+                s = 0
+                for b in bits:
+                    s ^= columnes[b]
+                if self.pes_lider[s] < 0:
+                    self.lider[s] = sum(1 << b for b in bits)
+                    self.pes_lider[s] = pes
+                    self.lider_unic[s] = True
+                    pendents -= 1
+                elif self.pes_lider[s] == pes:
+                    self.lider_unic[s] = False
+            # Acabem un cop totes les síndromes tenen líder i s'ha vist si és únic
+            if pendents == 0:
+                break
+
+    def distancia_minima(self):
+        """Pes mínim d'una paraula no nul·la del codi"""
+        paraules = (np.arange(1, 1 << self.k)[:, None] >> np.arange(self.k)) & 1
+        return int(((paraules @ self.G) % 2).sum(axis=1).min()) if self.k else 0
+
+    def simular(self, epsilon, n_blocs, rng=None, mida_lot=2**22):
+        """Envia n_blocs pel canal binari simètric; retorna un ResultatCodi"""
+        rng = np.random.default_rng(rng)
+        totals = np.zeros(5, dtype=np.int64)
+        fets = 0
+        while fets < n_blocs:
+            n = min(mida_lot, n_blocs - fets)
+            totals += self._simular_lot(epsilon, n, rng)
+            fets += n
+        return ResultatCodi(n_blocs, *(int(t) for t in totals))
+
+    def _simular_lot(self, epsilon, n, rng):
+        n_paraules = -(-n // 64)
+        E = bernoulli_empaquetat(epsilon, (self.n, n_paraules), rng)
+        # Els bits de l'última paraula que passen de n no són blocs
+        if n % 64:
+            E[:, -1] &= np.uint64((1 << (n % 64)) - 1)
+
+        zero = np.zeros(n_paraules, dtype=np.uint64)
+        erronis = np.bitwise_or.reduce(E, axis=0)
+        S = np.array([np.bitwise_xor.reduce(E[fila == 1], axis=0) if fila.any() else zero
+                      for fila in self.H]).reshape(self.r, n_paraules)
+        detectats = np.bitwise_or.reduce(S, axis=0) if self.r else zero
+        no_detectats = erronis & ~detectats
+
+        # Descodificació: la síndrome i el patró d'error de cada bloc com a
+        # enters; el bloc es corregeix si el patró és exactament el líder
+        sindromes = _enters_per_bloc(S, n)
+        patrons = _enters_per_bloc(E, n)
+        corregible = self.lider_unic[sindromes] & (sindromes != 0)
+        coincideix = corregible & (patrons == self.lider[sindromes])
+        corregits = int(np.count_nonzero(coincideix))
+        mal_corregits = int(np.count_nonzero(corregible)) - corregits
+        comptes = [_popcount(x) for x in (erronis, no_detectats, detectats)]
+        return np.array(comptes + [corregits, mal_corregits])
+
+
+def bernoulli_empaquetat(p, forma, rng):
+    """Array uint64 de la forma donada amb cada bit igual a 1 amb probabilitat p.
+
+    Per a p petita es generen directament les posicions dels uns amb salts
+    geomètrics (exacte). Si no, es combinen paraules aleatòries segons els
+    dígits binaris de p (32 dígits, biaix < 2^-32): de l'últim al primer,
+    r = u | r si el dígit és 1 i r = u & r si és 0.
+    """
+    paraules = np.zeros(forma, dtype=np.uint64)
+    if p <= 0:
+        return paraules
+    if p >= 1:
+        return ~paraules
+    pla = paraules.reshape(-1)
+    if p < 1 / 64:
+        total = pla.size * 64
+        posicions = []
+        ultima = -1
+        while ultima < total:
+            esperats = (total - ultima) * p
+            salts = rng.geometric(p, int(esperats + 6 * np.sqrt(esperats) + 16))
+            noves = ultima + np.cumsum(salts)
+            posicions.append(noves[noves < total])
+            ultima = noves[-1]
+        posicions = np.concatenate(posicions)
+        if posicions.size:
+            index = posicions >> 6
+            bits = np.left_shift(np.uint64(1), (posicions & 63).astype(np.uint64))
+            inici = np.flatnonzero(np.r_[True, index[1:] != index[:-1]])
+            pla[index[inici]] = np.bitwise_or.reduceat(bits, inici)
+        return paraules
+
+    digits = int(p * 2**32)
+    # Fins al primer dígit a 1 (començant per l'últim) r es queda a zero
+    primer = (digits & -digits).bit_length() - 1
+    resultat = np.zeros(pla.size, dtype=np.uint64)
+    for i in range(primer, 32):
+        u = rng.integers(np.iinfo(np.uint64).max, size=pla.size, dtype=np.uint64, endpoint=True)
+        if (digits >> i) & 1:
+            resultat |= u
+        else:
+            resultat &= u
+    pla[:] = resultat
+    return paraules
+
+
+def hamming(r=3):
+    """Codi de Hamming [2^r - 1, 2^r - 1 - r]: corregeix un error"""
+    n = 2**r - 1
+    H = (np.arange(1, n + 1)[None, :] >> np.arange(r)[:, None]) & 1
+    return CodiLineal(H=H, nom=f"Hamming({n},{n - r})")
+
+
+def hamming_estes(r=3):
+    """Hamming amb un bit de paritat global: corregeix un error i en detecta dos"""
+    base = hamming(r).H
+    n = base.shape[1] + 1
+    H = np.vstack([np.hstack([base, np.zeros((r, 1), dtype=np.uint8)]), np.ones((1, n), dtype=np.uint8)])
+    return CodiLineal(H=H, nom=f"Hamming estès({n},{n - r - 1})")
+
+
+def repeticio(n=3):
+    """Codi de repetició: un bit d'informació repetit n vegades"""
+    return CodiLineal(G=np.ones((1, n), dtype=np.uint8), nom=f"repetició({n},1)")
+
+
+def paritat(k=4):
+    """k bits d'informació i un bit de paritat (el codi de 5 bits de simular_canal)"""
+    return CodiLineal(H=np.ones((1, k + 1), dtype=np.uint8), nom=f"paritat({k + 1},{k})")
+
+
+def cru(k=4):
+    """k bits sense cap redundància (el símbol de 4 bits de simular_canal)"""
+    return CodiLineal(G=np.eye(k, dtype=np.uint8), nom=f"cru({k},{k})")
+
+
+def comparar_codis(codis, epsilon, n_blocs, rng=None, **opcions):
+    """Taxes de cada codi per a un mateix epsilon: {nom: taxes}"""
+    rng = np.random.default_rng(rng)
+    return {codi.nom: codi.simular(epsilon, n_blocs, rng, **opcions).taxes() for codi in codis}
@@ -0,0 +1,171 @@
+"""Corbes de nivell amb refinament adaptatiu (quadtree).
+
+Es comença amb una graella grollera i només es parteixen en quatre les
+cel·les per on pot passar la corba f = nivell, fins que la diagonal de les
+cel·les és <= tol. A les cel·les finals la corba es talla amb marching
+squares: cada tall sobre una aresta es localitza per bisecció, i els
+segments es cusen en poligonals.
+
+Fita d'error: la corba real i el segment que l'aproxima tenen els dos
+extrems sobre les arestes de la mateixa cel·la final, així que la distància
+(Hausdorff) entre la poligonal i la corba és com a màxim la diagonal de
+les cel·les finals. La fita suposa que la graella inicial és prou fina per
+veure totes les branques de la corba: una cel·la es refina si la corba la
+travessa segons els valors dels vèrtexs o si el nivell queda a menys d'una
+variació local (marge) del rang dels vèrtexs.
+"""
+from collections import namedtuple
+
+import numpy as np
+
+from capacitat_canal import capacitat_binaria
+
+CorbaNivell = namedtuple('CorbaNivell', ['poligonals', 'error', 'avaluacions'])
+
+
+def capacitat(eps_0, eps_1):
+    """C del canal binari asimètric (forma tancada)"""
+    return capacitat_binaria(eps_0, eps_1)[1]
+
+
+class _Avaluacions:
+    """Valors de f als vèrtexs de la graella més fina, calculats un sol cop"""
+
+    def __init__(self, funcio, x0, y0, h, N):
+        self.funcio, self.x0, self.y0, self.h, self.N = funcio, x0, y0, h, N
+        self.claus = np.empty(0, dtype=np.int64)
+        self.valors = np.empty(0)
+
+    def __call__(self, a, b):
+        """f als vèrtexs enters (a, b), arrays de la mateixa forma"""
+        claus = a * (self.N + 1) + b
+        unics, inversa = np.unique(claus, return_inverse=True)
+        pos = np.searchsorted(self.claus, unics)
+        coneguts = np.zeros(unics.size, dtype=bool)
+        dins = pos < self.claus.size
+        coneguts[dins] = self.claus[pos[dins]] == unics[dins]
+        nous = unics[~coneguts]
+        if nous.size:
+            valors_nous = self.funcio(self.x0 + (nous // (self.N + 1)) * self.h[0],
+                                      self.y0 + (nous % (self.N + 1)) * self.h[1])
+            claus_totes = np.concatenate([self.claus, nous])
+            ordre = np.argsort(claus_totes)
+            self.claus = claus_totes[ordre]
+            self.valors = np.concatenate([self.valors, valors_nous])[ordre]
+        return self.valors[np.searchsorted(self.claus, unics)][inversa].reshape(np.shape(a))
+
+
+def _talls(funcio, nivell, p, q, fp, iteracions):
+    """Punt de cada segment p-q on f creua el nivell (f(p) - nivell i f(q) - nivell de signe oposat)"""
+    amunt_p = fp >= nivell
+    for _ in range(iteracions):
+        m = (p + q) / 2
+        mateix = (funcio(m[:, 0], m[:, 1]) >= nivell) == amunt_p
+        p = np.where(mateix[:, None], m, p)
+        q = np.where(mateix[:, None], q, m)
+    return (p + q) / 2
+
+
+def _cosir(segments):
+    """Uneix segments (parells de claus d'aresta) en cadenes de claus"""
+    veins = {}
+    for k, (e1, e2) in enumerate(segments):
+        veins.setdefault(e1, []).append(k)
+        veins.setdefault(e2, []).append(k)
+    usat = np.zeros(len(segments), dtype=bool)
+
+    def seguir(aresta, k):
+        cadena = [aresta]
+        while k is not None:
+            usat[k] = True
+            e1, e2 = segments[k]
+            aresta = e2 if e1 == aresta else e1
+            cadena.append(aresta)
+            k = next((j for j in veins[aresta] if not usat[j]), None)
+        return cadena
+
+    cadenes = []
+    # Primer les obertes (comencen en una aresta de la vora), després els tancats
+    for aresta, ks in veins.items():
+        if len(ks) == 1 and not usat[ks[0]]:
+            cadenes.append(seguir(aresta, ks[0]))
+    for k in range(len(segments)):
+        if not usat[k]:
+            cadenes.append(seguir(segments[k][0], k))
+    return cadenes
+
+
+def corba_nivell(funcio, nivell, x0, x1, y0, y1, tol=1e-4, n_inicial=16, marge=1.0, iteracions_tall=None):
+    """Corba f(x, y) = nivell dins de [x0, x1] x [y0, y1] amb error <= tol.
+
+    funcio s'avalua amb arrays. Retorna CorbaNivell(poligonals, error,
+    avaluacions): una llista d'arrays (M, 2) de punts (x, y), la fita
+    d'error (diagonal de les cel·les finals més l'error de la bisecció dels
+    talls, que és mil vegades més petit) i quantes vegades s'ha avaluat
+    funcio, per comparar-ho amb una graella uniforme.
+    """
+    diagonal = np.hypot((x1 - x0) / n_inicial, (y1 - y0) / n_inicial)
+    nivells = max(0, int(np.ceil(np.log2(diagonal / tol))))
+    N = n_inicial * 2**nivells
+    h = ((x1 - x0) / N, (y1 - y0) / N)
+    avaluacions = [0]
+
+    def f_comptada(x, y):
+        avaluacions[0] += np.size(x)
+        return funcio(x, y)
+    f = _Avaluacions(f_comptada, x0, y0, h, N)
+
+    # Cel·les (i, j) del nivell actual; en unitats de la graella fina mesuren s
+    i, j = (g.ravel() for g in np.meshgrid(np.arange(n_inicial), np.arange(n_inicial), indexing='ij'))
+    for l in range(nivells + 1):
+        s = 2**(nivells - l)
+        a, b = i * s, j * s
+        v = np.stack([f(a, b), f(a + s, b), f(a + s, b + s), f(a, b + s)])
+        v_min, v_max = v.min(axis=0), v.max(axis=0)
+        if l == nivells:
+            creuades = (v_min < nivell) & (v_max >= nivell)
+            i, j, v = i[creuades], j[creuades], v[:, creuades]
+            break
+        variacio = marge * (v_max - v_min)
+        actives = (v_min - variacio <= nivell) & (nivell <= v_max + variacio)
+        i, j = i[actives], j[actives]
+        i = (2 * i[:, None] + np.array([0, 1, 0, 1])).ravel()
+        j = (2 * j[:, None] + np.array([0, 0, 1, 1])).ravel()
+
+    # Marching squares a les cel·les finals. Arestes: 0 baix, 1 dreta, 2 dalt, 3 esquerra;
+    # clau global = 2 * (índex del vèrtex inicial) + (0 horitzontal, 1 vertical)
+    amunt = v >= nivell
+    claus = np.stack([2 * (i * (N + 1) + j), 2 * ((i + 1) * (N + 1) + j) + 1,
+                      2 * (i * (N + 1) + j + 1), 2 * (i * (N + 1) + j) + 1])
+    creua = np.stack([amunt[0] != amunt[1], amunt[1] != amunt[2],
+                      amunt[3] != amunt[2], amunt[0] != amunt[3]])
+    centre = None
+    if np.any(creua.sum(axis=0) == 4):
+        centre = f_comptada(x0 + (i + 0.5) * h[0], y0 + (j + 0.5) * h[1]) >= nivell
+    segments = []
+    for c in range(i.size):
+        arestes = np.flatnonzero(creua[:, c])
+        if arestes.size == 2:
+            segments.append((int(claus[arestes[0], c]), int(claus[arestes[1], c])))
+        elif arestes.size == 4:
+            # Punt de sella: el centre decideix quines cantonades queden separades
+            if centre[c] == amunt[0, c]:
+                parells = ((0, 1), (3, 2))
+            else:
+                parells = ((3, 0), (1, 2))
+            segments.extend((int(claus[e1, c]), int(claus[e2, c])) for e1, e2 in parells)
+
+    # Tall exacte (fins a la bisecció) sobre cada aresta creuada
+    arestes = np.unique(np.array(segments, dtype=np.int64).ravel()) if segments else np.empty(0, dtype=np.int64)
+    vertex, vertical = arestes // 2, arestes % 2
+    a, b = vertex // (N + 1), vertex % (N + 1)
+    p = np.stack([x0 + a * h[0], y0 + b * h[1]], axis=1)
+    q = p + np.stack([(1 - vertical) * h[0], vertical * h[1]], axis=1)
+    if iteracions_tall is None:
+        iteracions_tall = int(np.ceil(np.log2(max(h) / (1e-3 * tol)))) if arestes.size else 0
+    punts = _talls(f_comptada, nivell, p, q, f(a, b), iteracions_tall)
+    index = {int(clau): k for k, clau in enumerate(arestes)}
+
+    poligonals = [punts[[index[clau] for clau in cadena]] for cadena in _cosir(segments)]
+    error = float(np.hypot(*h)) + max(h) / 2**iteracions_tall
+    return CorbaNivell(poligonals, error, avaluacions[0])
@@ -0,0 +1,74 @@
+"""Simulació espacial d'àtoms travessant un imant de Stern-Gerlach.
+
+Cada àtom surt del forn amb una velocitat longitudinal i una posició i
+velocitat transversals gaussianes, rep una força ±μ ∂B/∂z constant dins
+de l'imant segons el resultat de la mesura d'espí, i vola lliurement fins
+a la pantalla. Les trajectòries són balístiques, així que la posició
+d'impacte de tot el conjunt es calcula en forma tancada amb arrays.
+"""
+import numpy as np
+
+# Valors de l'experiment original amb àtoms d'argent (unitats SI)
+PARAMETRES = {
+    'massa': 1.79e-25,              # kg, àtom d'argent
+    'mu': 9.274e-24,                # J/T, magnetó de Bohr
+    'gradient': 1000.0,             # T/m
+    'longitud_iman': 0.035,         # m
+    'distancia_pantalla': 0.25,     # m, des de la sortida de l'imant
+    'v0': 550.0,                    # m/s, velocitat longitudinal mitjana
+    'sigma_v': 50.0,                # m/s, dispersió de la velocitat longitudinal
+    'sigma_pos': 3e-5,              # m, amplada del feix a l'entrada
+    'sigma_vt': 0.2,                # m/s, dispersió de la velocitat transversal
+}
+
+
+def desviacio_pantalla(v=None, **parametres):
+    """Desviació en z a la pantalla d'un àtom amb espí amunt i velocitat v"""
+    p = dict(PARAMETRES, **parametres)
+    v = p['v0'] if v is None else v
+    a = p['mu'] * p['gradient'] / p['massa']
+    t_iman = p['longitud_iman'] / v
+    t_vol = p['distancia_pantalla'] / v
+    return 0.5 * a * t_iman**2 + a * t_iman * t_vol
+
+
+def simular_impactes(prob_up, n, rng=None, **parametres):
+    """Posicions (y, z) a la pantalla i espí (+1/-1) de n àtoms"""
+    rng = np.random.default_rng(rng)
+    p = dict(PARAMETRES, **parametres)
+    espi = np.where(rng.random(n) < prob_up, 1.0, -1.0)
+    v = np.abs(rng.normal(p['v0'], p['sigma_v'], n))
+    y0, z0 = rng.normal(0.0, p['sigma_pos'], (2, n))
+    vy, vz = rng.normal(0.0, p['sigma_vt'], (2, n))
+
+    # Dins de l'imant: acceleració constant ±a en z; després, vol lliure
+    a = espi * (p['mu'] * p['gradient'] / p['massa'])
+    t_total = (p['longitud_iman'] + p['distancia_pantalla']) / v
+    t_iman = p['longitud_iman'] / v
+    t_vol = t_total - t_iman
+    z = z0 + vz * t_total + 0.5 * a * t_iman**2 + a * t_iman * t_vol
+    y = y0 + vy * t_total
+    return y, z, espi
+
+
+def histograma_per_lots(prob_up, n_total, mida_lot=200000, bins=(40, 200), rang=None,
+                        rng=None, **parametres):
+    """Genera l'histograma 2D d'impactes acumulat després de cada lot.
+
+    rang és ((y_min, y_max), (z_min, z_max)); per defecte cobreix els dos
+    feixos amb marge. Cada iteració retorna (àtoms fets, histograma,
+    vores_y, vores_z), de manera que es pot anar dibuixant mentre avança.
+    """
+    rng = np.random.default_rng(rng)
+    if rang is None:
+        z_max = 2 * desviacio_pantalla(**parametres)
+        rang = ((-z_max / 4, z_max / 4), (-z_max, z_max))
+    histograma = np.zeros(bins, dtype=np.int64)
+    fets = 0
+    while fets < n_total:
+        n = min(mida_lot, n_total - fets)
+        y, z, _ = simular_impactes(prob_up, n, rng, **parametres)
+        h, vores_y, vores_z = np.histogram2d(y, z, bins=bins, range=rang)
+        histograma += h.astype(np.int64)
+        fets += n
+        yield fets, histograma, vores_y, vores_z
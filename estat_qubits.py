@@ -0,0 +1,90 @@
+import numpy as np
+
+
+def matriu_mesura(theta):
+    """Unitària que porta la base pròpia de σ(θ) = cos θ σ_z + sin θ σ_x a la base z"""
+    c, s = np.cos(theta / 2), np.sin(theta / 2)
+    return np.array([[c, s], [s, -c]], dtype=complex)
+
+
+class EstatQubits:
+    """Vector d'estat de n qubits guardat en un ndarray complex128 contigu.
+
+    L'amplitud de l'índex i correspon a la cadena de bits de i amb el qubit 0
+    com a bit més significatiu, igual que estado[0..3] = |00⟩, |01⟩, |10⟩,
+    |11⟩ als scripts de dos qubits. Totes les operacions modifiquen
+    self.amplituds in situ.
+    """
+
+    def __init__(self, amplituds):
+        if np.isscalar(amplituds):
+            n = int(amplituds)
+            amplituds = np.zeros(2**n, dtype=np.complex128)
+            amplituds[0] = 1.0
+        self.amplituds = np.ascontiguousarray(amplituds, dtype=np.complex128).copy()
+        self.n_qubits = int(np.log2(self.amplituds.size))
+        if 2**self.n_qubits != self.amplituds.size:
+            raise ValueError("El nombre d'amplituds ha de ser una potència de 2")
+
+    def _vista(self, qubit):
+        """Vista (abans, 2, després) de les amplituds al voltant d'un qubit"""
+        return self.amplituds.reshape(2**qubit, 2, -1)
+
+    def norma(self):
+        return np.sqrt(np.vdot(self.amplituds, self.amplituds).real)
+
+    def normalitzar(self):
+        self.amplituds /= self.norma()
+        return self
+
+    def aplicar_porta(self, U, qubit):
+        """Aplica una porta 2x2 a un qubit sense construir la matriu 2^n x 2^n"""
+        v = self._vista(qubit)
+        a0 = v[:, 0, :].copy()
+        v[:, 0, :] *= U[0, 0]
+        v[:, 0, :] += U[0, 1] * v[:, 1, :]
+        v[:, 1, :] *= U[1, 1]
+        v[:, 1, :] += U[1, 0] * a0
+        return self
+
+    def rotar_base(self, qubit, theta):
+        """Passa el qubit a la base de mesura σ(θ); després es mesura en z"""
+        return self.aplicar_porta(matriu_mesura(theta), qubit)
+
+    def probabilitats(self, qubits=None):
+        """Probabilitats marginals dels qubits donats, en l'ordre donat (2^k valors)"""
+        if qubits is None:
+            qubits = range(self.n_qubits)
+        qubits = list(qubits)
+        p = (self.amplituds.real**2 + self.amplituds.imag**2).reshape((2,) * self.n_qubits)
+        altres = tuple(q for q in range(self.n_qubits) if q not in qubits)
+        p = p.sum(axis=altres)
+        # Després de sumar, els eixos que queden estan en ordre creixent
+        ordre = sorted(qubits)
+        p = np.transpose(p, [ordre.index(q) for q in qubits])
+        return p.reshape(-1)
+
+    def correlacio(self, qubits):
+        """⟨Z⊗...⊗Z⟩ sobre els qubits donats (valors ±1 com als scripts)"""
+        p = self.probabilitats(qubits).reshape((2,) * len(qubits))
+        signe = np.ones(1)
+        for _ in qubits:
+            signe = np.multiply.outer(signe, np.array([1.0, -1.0]))
+        return float(np.sum(p * signe.reshape(p.shape)))
+
+    def colapsar(self, qubit, resultat):
+        """Projecta el qubit sobre |resultat⟩ i renormalitza; retorna la probabilitat"""
+        v = self._vista(qubit)
+        v[:, 1 - resultat, :] = 0
+        p = self.norma()**2
+        if p > 0:
+            self.amplituds /= np.sqrt(p)
+        return p
+
+    def mesurar(self, qubit, rng=None):
+        """Mesura el qubit en z, col·lapsa l'estat i retorna 0 o 1"""
+        rng = np.random.default_rng(rng)
+        p0 = self.probabilitats([qubit])[0]
+        resultat = 0 if rng.random() < p0 else 1
+        self.colapsar(qubit, resultat)
+        return resultat
@@ -0,0 +1,119 @@
+from collections import OrderedDict
+
+import numpy as np
+
+# Base: |↑↑⟩, |↑↓⟩, |↓↑⟩, |↓↓⟩ (primer espí = bit més significatiu)
+SX = np.array([[0, 1], [1, 0]], dtype=complex) / 2
+SY = np.array([[0, -1j], [1j, 0]], dtype=complex) / 2
+SZ = np.array([[1, 0], [0, -1]], dtype=complex) / 2
+I2 = np.eye(2, dtype=complex)
+
+ESTAT_AMUNT_AVALL = np.array([0, 1, 0, 0], dtype=complex)
+
+
+def hamiltonia_heisenberg(C=1.0):
+    """H = C S1·S2 (amb hbar = 1)"""
+    return hamiltonia_anisotrop(C, C, C)
+
+
+def hamiltonia_anisotrop(Jx, Jy, Jz, B1=0.0, B2=0.0):
+    """H = Jx S1x S2x + Jy S1y S2y + Jz S1z S2z + B1 S1z + B2 S2z"""
+    return (Jx * np.kron(SX, SX) + Jy * np.kron(SY, SY) + Jz * np.kron(SZ, SZ)
+            + B1 * np.kron(SZ, I2) + B2 * np.kron(I2, SZ))
+
+
+def concurrencia(estats):
+    """Concurrència d'estats purs de dos qubits, C = 2|ad - bc|, sobre l'últim eix"""
+    estats = np.asarray(estats)
+    return 2 * np.abs(estats[..., 0] * estats[..., 3] - estats[..., 1] * estats[..., 2])
+
+
+class EvolucioEspins:
+    """Evolució unitària de dos espins sota un hamiltonià 4x4 qualsevol.
+
+    H es diagonalitza un sol cop; l'estat a qualsevol conjunt de temps és
+    V exp(-i E t) V† |ψ0⟩, calculat per a tot l'array de temps alhora.
+    """
+
+    def __init__(self, H, estat_inicial=ESTAT_AMUNT_AVALL):
+        H = np.asarray(H, dtype=complex)
+        if H.shape != (4, 4) or not np.allclose(H, H.conj().T):
+            raise ValueError("H ha de ser una matriu hermítica 4x4")
+        estat_inicial = np.asarray(estat_inicial, dtype=complex)
+        self.H = H
+        self.energies, self.vectors = np.linalg.eigh(H)
+        # Components de l'estat inicial en la base pròpia
+        self.coeficients = self.vectors.conj().T @ (estat_inicial / np.linalg.norm(estat_inicial))
+
+    def estats(self, t):
+        """Estats |ψ(t)⟩ de forma (..., 4) per a un array de temps"""
+        t = np.asarray(t, dtype=float)
+        fases = np.exp(-1j * t[..., None] * self.energies) * self.coeficients
+        return fases @ self.vectors.T
+
+    def probabilitats(self, t):
+        """Probabilitats dels quatre estats base, forma (..., 4)"""
+        return np.abs(self.estats(t))**2
+
+    def concurrencia(self, t):
+        return concurrencia(self.estats(t))
+
+    def estats_base_actius(self, tol=1e-9):
+        """Índexs dels estats base amb probabilitat no nul·la en algun moment"""
+        pesos = np.abs(self.vectors * self.coeficients)
+        return [k for k in range(4) if pesos[k].max() > tol]
+
+
+class SerieTemporal:
+    """Observables f(t) calculats a demanda, per blocs i amb memòria cau.
+
+    El temps es divideix en blocs de punts_per_bloc mostres. Al nivell L
+    cada bloc dura durada_bloc / 2^L (L pot ser negatiu per a finestres
+    molt llargues), de manera que fer zoom només calcula blocs més fins de
+    la part visible. Es guarden com a molt max_blocs blocs; quan n'hi ha
+    més, s'esborren els que fa més temps que no es fan servir.
+    """
+
+    def __init__(self, funcio, durada_bloc, punts_per_bloc=256, max_blocs=256):
+        self.funcio = funcio
+        self.durada_bloc = float(durada_bloc)
+        self.punts_per_bloc = int(punts_per_bloc)
+        self.max_blocs = int(max_blocs)
+        self._blocs = OrderedDict()
+
+    def _bloc(self, nivell, index):
+        clau = (nivell, index)
+        if clau in self._blocs:
+            self._blocs.move_to_end(clau)
+            return self._blocs[clau]
+        durada = self.durada_bloc * 2.0**(-nivell)
+        t = index * durada + np.arange(self.punts_per_bloc) * (durada / self.punts_per_bloc)
+        bloc = (t, np.asarray(self.funcio(t)))
+        self._blocs[clau] = bloc
+        if len(self._blocs) > self.max_blocs:
+            self._blocs.popitem(last=False)
+        return bloc
+
+    def nivell(self, t0, t1, n_punts):
+        """Nivell amb espaiat <= (t1 - t0) / n_punts"""
+        return int(np.ceil(np.log2(self.durada_bloc * n_punts / (self.punts_per_bloc * (t1 - t0)))))
+
+    def finestra(self, t0, t1, n_punts=1000):
+        """Temps i valors dins de [t0, t1], amb almenys n_punts mostres.
+
+        Les mostres dels blocs que cauen dins de la finestra s'hi retornen
+        tal qual; t0 i t1 s'avaluen exactament perquè la corba arribi a les vores.
+        """
+        nivell = self.nivell(t0, t1, n_punts)
+        durada = self.durada_bloc * 2.0**(-nivell)
+        # Blocs des del que conté t0 fins al que conté t1 (inclòs)
+        primer = int(np.floor(t0 / durada))
+        ultim = max(int(np.ceil(t1 / durada)) - 1, primer)
+        blocs = [self._bloc(nivell, i) for i in range(primer, ultim + 1)]
+        t = np.concatenate([b[0] for b in blocs])
+        valors = np.concatenate([b[1] for b in blocs])
+        dins = (t > t0) & (t < t1)
+        vores = np.array([t0, t1], dtype=float)
+        valors_vores = np.asarray(self.funcio(vores))
+        return (np.concatenate([vores[:1], t[dins], vores[1:]]),
+                np.concatenate([valors_vores[:1], valors[dins], valors_vores[1:]]))
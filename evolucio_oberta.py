@@ -0,0 +1,100 @@
+import numpy as np
+
+from evolucio_espins import ESTAT_AMUNT_AVALL, I2
+
+SIGMA_Z = np.array([[1, 0], [0, -1]], dtype=complex)
+SIGMA_Y = np.array([[0, -1j], [1j, 0]], dtype=complex)
+# σ- = |↓⟩⟨↑| amb la base |↑⟩ = índex 0, |↓⟩ = índex 1
+SIGMA_MENYS = np.array([[0, 0], [1, 0]], dtype=complex)
+I4 = np.eye(4, dtype=complex)
+
+
+def _expm(A):
+    """exp(A) per a un lot de matrius (..., n, n): escalat, Taylor i quadrats"""
+    A = np.asarray(A, dtype=complex)
+    norma = np.max(np.abs(A).sum(axis=-1), initial=0.0)
+    s = max(0, int(np.ceil(np.log2(norma / 0.5)))) if norma > 0 else 0
+    X = A / 2.0**s
+    resultat = np.broadcast_to(np.eye(A.shape[-1], dtype=complex), A.shape).copy()
+    terme = resultat.copy()
+    for k in range(1, 19):
+        terme = terme @ X / k
+        resultat += terme
+    for _ in range(s):
+        resultat = resultat @ resultat
+    return resultat
+
+
+def liouvillia(H, gamma_fase=0.0, gamma_amortiment=0.0):
+    """Superoperador de Lindblad 16x16 (o un lot (B, 16, 16) si les taxes són arrays).
+
+    Cada qubit té desfasament L = sqrt(γ_φ/2) σ_z (les coherències decauen
+    com exp(-γ_φ t)) i amortiment L = sqrt(γ_1) σ- (la població de |↑⟩ decau
+    com exp(-γ_1 t)). Vectoritzem ρ per files: vec(A ρ B) = (A ⊗ B^T) vec(ρ).
+    """
+    H = np.asarray(H, dtype=complex)
+    gamma_fase, gamma_amortiment = np.broadcast_arrays(np.asarray(gamma_fase, dtype=float),
+                                                       np.asarray(gamma_amortiment, dtype=float))
+    L = -1j * (np.kron(H, I4) - np.kron(I4, H.T))
+    L = np.broadcast_to(L, gamma_fase.shape + (16, 16)).copy()
+    for operador, taxa in ((SIGMA_Z, gamma_fase / 2), (SIGMA_MENYS, gamma_amortiment)):
+        for C in (np.kron(operador, I2), np.kron(I2, operador)):
+            CdC = C.conj().T @ C
+            dissipador = (np.kron(C, C.conj()) - 0.5 * np.kron(CdC, I4) - 0.5 * np.kron(I4, CdC.T))
+            L += taxa[..., None, None] * dissipador
+    return L
+
+
+def concurrencia_wootters(rho):
+    """Concurrència de Wootters per a matrius densitat (..., 4, 4)"""
+    rho = np.asarray(rho, dtype=complex)
+    YY = np.kron(SIGMA_Y, SIGMA_Y)
+    rho_tilde = YY @ rho.conj() @ YY
+    valors = np.linalg.eigvals(rho @ rho_tilde)
+    lambdes = np.sort(np.sqrt(np.clip(valors.real, 0.0, None)), axis=-1)[..., ::-1]
+    return np.maximum(0.0, lambdes[..., 0] - lambdes[..., 1] - lambdes[..., 2] - lambdes[..., 3])
+
+
+class EvolucioOberta:
+    """Evolució de la matriu densitat de dos espins amb l'equació de Lindblad.
+
+    gamma_fase i gamma_amortiment poden ser arrays de forma (B,): cada joc de
+    taxes és un sistema independent i tots s'integren alhora. Per a una
+    graella de temps uniforme el propagador exp(L dt) es calcula un sol cop
+    per joc de taxes i s'aplica pas a pas.
+    """
+
+    def __init__(self, H, estat_inicial=ESTAT_AMUNT_AVALL, gamma_fase=0.0, gamma_amortiment=0.0):
+        self.L = liouvillia(H, gamma_fase, gamma_amortiment)
+        estat_inicial = np.asarray(estat_inicial, dtype=complex)
+        if estat_inicial.shape == (4,):
+            estat_inicial = estat_inicial / np.linalg.norm(estat_inicial)
+            estat_inicial = np.outer(estat_inicial, estat_inicial.conj())
+        self.rho0 = estat_inicial.reshape(16)
+
+    def matrius_densitat(self, t):
+        """ρ(t) de forma (B..., T, 4, 4) per a un array 1D de temps creixents"""
+        t = np.atleast_1d(np.asarray(t, dtype=float))
+        forma_lot = self.L.shape[:-2]
+        passos = np.diff(t)
+        if t.size > 1 and np.allclose(passos, passos[0]):
+            # Graella uniforme: exp(L t0) per començar i exp(L dt) a cada pas
+            r = np.einsum('...ij,j->...i', _expm(self.L * t[0]), self.rho0)
+            P = _expm(self.L * passos[0])
+            rhos = np.empty(forma_lot + (t.size, 16), dtype=complex)
+            rhos[..., 0, :] = r
+            for k in range(1, t.size):
+                r = np.einsum('...ij,...j->...i', P, r)
+                rhos[..., k, :] = r
+        else:
+            # Temps qualssevol: un exponencial per temps, tots en un lot
+            U = _expm(self.L[..., None, :, :] * t[:, None, None])
+            rhos = np.einsum('...tij,j->...ti', U, self.rho0)
+        return rhos.reshape(forma_lot + (t.size, 4, 4))
+
+    def probabilitats(self, t):
+        """Poblacions dels quatre estats base, forma (B..., T, 4)"""
+        return np.diagonal(self.matrius_densitat(t), axis1=-2, axis2=-1).real
+
+    def concurrencia(self, t):
+        return concurrencia_wootters(self.matrius_densitat(t))
@@ -0,0 +1,258 @@
+"""Execució sense interfície gràfica de molts experiments en paral·lel.
+
+Llegeix un fitxer JSON amb una llista de treballs (o JSON Lines, un treball
+per línia), els executa amb les funcions de simulació dels mòduls en un
+pool de processos i desa els resultats en columnes (.npz o .csv).
+
+Exemple de treballs:
+    [{"tipus": "entrellacament", "estat": ["0.7071", 0, 0, "0.7071"], "alpha": 45, "n": 100000},
+     {"tipus": "stern_gerlach", "c_up": [1, 0], "c_down": [0, 1], "n": 1000000},
+     {"tipus": "canal", "epsilon": 0.1, "N": 1000000},
+     {"tipus": "shannon", "epsilon_1": 0.1, "epsilon_0": 0.0, "N": 1000000, "llavor": 7}]
+
+Ús:
+    python execucio_lots.py treballs.json -o resultats.npz -j 8 --llavor 7 --figures figures/
+"""
+import argparse
+import csv
+import glob
+import importlib.util
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from aleatorietat import llavor_fill
+
+DIRECTORI = os.path.dirname(os.path.abspath(__file__))
+
+# Scripts amb interfície (els seus noms no es poden importar amb import)
+SCRIPTS = {
+    'entrellacament': 'Entrella*Copilot*.py',
+    'stern_gerlach': 'Stern-Gernlach*.py',
+    'visualitzador': 'Entrella*_G*.py',
+}
+
+_moduls = {}
+
+
+def carregar_script(nom):
+    """Importa un dels scripts del repositori (una sola vegada per procés)"""
+    if nom not in _moduls:
+        # Cap finestra: els scripts que importen matplotlib fan servir Agg
+        os.environ.setdefault('MPLBACKEND', 'Agg')
+        cami = glob.glob(os.path.join(DIRECTORI, SCRIPTS[nom]))[0]
+        spec = importlib.util.spec_from_file_location(f'_script_{nom}', cami)
+        modul = importlib.util.module_from_spec(spec)
+        # Registrat a sys.modules perquè pickle el trobi dins d'aquest procés. Els
+        # processos fills (spawn/forkserver) no el tenen: per passar-los una
+        # funció d'un script cal fer servir FuncioScript
+        sys.modules[spec.name] = modul
+        spec.loader.exec_module(modul)
+        _moduls[nom] = modul
+    return _moduls[nom]
+
+
+class FuncioScript:
+    """Funció d'un script que es pot enviar a un pool de processos.
+
+    Només es serialitza el nom de l'script i de la funció; cada procés
+    carrega l'script pel seu camí la primera vegada que la crida, de manera
+    que funciona amb qualsevol mètode d'inici (fork, spawn o forkserver).
+
+        with ProcessPoolExecutor(mp_context=get_context('spawn')) as pool:
+            pool.map(FuncioScript('visualitzador', 'concurrencia_wootters'), matrius)
+    """
+
+    def __init__(self, nom, atribut):
+        self.nom, self.atribut = nom, atribut
+
+    def __call__(self, *args, **kwargs):
+        return getattr(carregar_script(self.nom), self.atribut)(*args, **kwargs)
+
+    def __repr__(self):
+        return f"FuncioScript({self.nom!r}, {self.atribut!r})"
+
+
+def _complex(x):
+    """Nombre complex a partir de 0.5, "0.5+0.5j" o [0.5, 0.5]"""
+    if isinstance(x, (list, tuple)):
+        return complex(*x)
+    return complex(x)
+
+
+def _entrellacament(treball, rng):
+    from mesura_conjunta import calcular_valors_esperats_teorics, simular_medida_quantica
+    estat = np.array([_complex(x) for x in treball['estat']])
+    alpha = np.radians(float(treball.get('alpha', 0.0)))
+    n = int(treball.get('n', 1000))
+    resultados, _, A_avg, B_avg, sum_avg, prod_avg = simular_medida_quantica(estat, alpha, n, rng)
+    E_A, E_B, E_prod = calcular_valors_esperats_teorics(estat, alpha)
+    return {'n': n, 'alpha': float(treball.get('alpha', 0.0)),
+            'n_pp': resultados['++'], 'n_pm': resultados['+-'],
+            'n_mp': resultados['-+'], 'n_mm': resultados['--'],
+            'A_avg': A_avg, 'B_avg': B_avg, 'sum_avg': sum_avg, 'prod_avg': prod_avg,
+            'E_A': E_A, 'E_B': E_B, 'E_prod': E_prod}
+
+
+def _stern_gerlach(treball, rng):
+    from simulacio_sg import simular_stern_gerlach
+    c_up = _complex(treball.get('c_up', 1.0))
+    c_down = _complex(treball.get('c_down', 0.0))
+    n = int(treball.get('n', 1000))
+    prob_up = abs(c_up)**2 / (abs(c_up)**2 + abs(c_down)**2)
+    sim_mean, sim_std, count_up, count_down = simular_stern_gerlach(prob_up, n, rng)
+    exp_val = 2 * prob_up - 1
+    return {'n': n, 'prob_up': prob_up, 'sim_mean': sim_mean, 'sim_std': sim_std,
+            'count_up': count_up, 'count_down': count_down,
+            'exp_val': exp_val, 'std_dev': np.sqrt(1 - exp_val**2)}
+
+
+def _canal(treball, rng):
+    from Error_detection import simular_canal_vectorial
+    epsilon = float(treball['epsilon'])
+    N = int(treball.get('N', 100000))
+    perc_corruptes_4, perc_detectats = simular_canal_vectorial(epsilon, N, rng)
+    return {'N': N, 'epsilon': epsilon, 'perc_corruptes_4': perc_corruptes_4,
+            'perc_detectats': perc_detectats}
+
+
+def _shannon(treball, rng):
+    from Error_detection import simular_shannon_vectorial
+    epsilon_1 = float(treball['epsilon_1'])
+    epsilon_0 = float(treball.get('epsilon_0', 0.0))
+    N = int(treball.get('N', 100000))
+    percentatge = simular_shannon_vectorial(epsilon_1, N, epsilon_0, rng=rng)
+    return {'N': N, 'epsilon_0': epsilon_0, 'epsilon_1': epsilon_1,
+            'perc_corruptes': percentatge}
+
+
+TIPUS = {
+    'entrellacament': _entrellacament,
+    'stern_gerlach': _stern_gerlach,
+    'canal': _canal,
+    'shannon': _shannon,
+}
+
+
+def executar_treball(treball, llavor=None, posicio=None):
+    """Executa un treball i retorna un diccionari de resultats (una fila).
+
+    Si el treball no porta 'llavor' pròpia i se'n dona una de global, el
+    treball fa servir el flux fill de la llavor global amb la seva posició
+    a la llista de treballs (qualsevol que sigui el seu id).
+    """
+    if 'llavor' in treball:
+        rng = np.random.default_rng(treball['llavor'])
+    elif llavor is not None:
+        if posicio is None:
+            raise ValueError(f"Treball {treball['id']}: amb una llavor global cal la seva posició")
+        rng = np.random.default_rng(llavor_fill(llavor, posicio))
+    else:
+        rng = np.random.default_rng()
+    fila = {'id': treball['id'], 'tipus': treball['tipus']}
+    fila.update(TIPUS[treball['tipus']](treball, rng))
+    return fila
+
+
+def llegir_treballs(fitxer):
+    """Llegeix la llista de treballs d'un fitxer JSON o JSON Lines"""
+    with open(fitxer, encoding='utf-8') as f:
+        if fitxer.endswith('.jsonl'):
+            treballs = [json.loads(linia) for linia in f if linia.strip()]
+        else:
+            treballs = json.load(f)
+    for i, treball in enumerate(treballs):
+        treball.setdefault('id', i)
+        if treball.get('tipus') not in TIPUS:
+            raise ValueError(f"Treball {treball['id']}: tipus desconegut {treball.get('tipus')!r}")
+    return treballs
+
+
+def executar_lots(treballs, processos=None, llavor=None):
+    """Executa tots els treballs en un pool de processos, en l'ordre donat.
+
+    Amb una llavor global els resultats no depenen del nombre de processos.
+    """
+    posicions = range(len(treballs))
+    if processos == 1:
+        return [executar_treball(t, llavor, i) for t, i in zip(treballs, posicions)]
+    with ProcessPoolExecutor(max_workers=processos) as pool:
+        return list(pool.map(executar_treball, treballs, [llavor] * len(treballs), posicions,
+                             chunksize=max(1, len(treballs) // 64)))
+
+
+def a_columnes(resultats):
+    """Converteix les files en columnes; els camps que falten queden buits"""
+    claus = []
+    for fila in resultats:
+        claus.extend(c for c in fila if c not in claus)
+    return {c: [fila.get(c) for fila in resultats] for c in claus}
+
+
+def desar_resultats(resultats, fitxer):
+    """Desa els resultats en columnes, en .npz o .csv segons l'extensió"""
+    columnes = a_columnes(resultats)
+    if fitxer.endswith('.npz'):
+        arrays = {}
+        for clau, valors in columnes.items():
+            if all(isinstance(v, str) for v in valors):
+                arrays[clau] = np.array(valors)
+            else:
+                arrays[clau] = np.array([np.nan if v is None else v for v in valors], dtype=float)
+        np.savez(fitxer, **arrays)
+    else:
+        with open(fitxer, 'w', newline='', encoding='utf-8') as f:
+            escriptor = csv.writer(f)
+            escriptor.writerow(columnes)
+            for fila in zip(*columnes.values()):
+                escriptor.writerow(['' if v is None else v for v in fila])
+
+
+def renderitzar(resultats, directori):
+    """Desa una figura de comptes per a cada treball d'entrellaçament o Stern-Gerlach"""
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    os.makedirs(directori, exist_ok=True)
+    for fila in resultats:
+        if fila['tipus'] == 'entrellacament':
+            etiquetes = ['++', '+-', '-+', '--']
+            comptes = [fila['n_pp'], fila['n_pm'], fila['n_mp'], fila['n_mm']]
+            titol = f"α={fila['alpha']:.1f}°, producte={fila['prod_avg']:.3f}"
+        elif fila['tipus'] == 'stern_gerlach':
+            etiquetes = ['↑', '↓']
+            comptes = [fila['count_up'], fila['count_down']]
+            titol = f"Mitjana (sim) = {fila['sim_mean']:.4f}"
+        else:
+            continue
+        fig, ax = plt.subplots(figsize=(5, 4))
+        ax.bar(etiquetes, comptes, color='skyblue')
+        ax.set_ylabel('Comptatge')
+        ax.set_title(titol)
+        fig.savefig(os.path.join(directori, f"{fila['tipus']}_{fila['id']}.png"))
+        plt.close(fig)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Executa experiments sense interfície gràfica")
+    parser.add_argument('treballs', help="fitxer .json o .jsonl amb la llista de treballs")
+    parser.add_argument('-o', '--sortida', default='resultats.npz', help="fitxer .npz o .csv")
+    parser.add_argument('-j', '--processos', type=int, default=None, help="nombre de processos")
+    parser.add_argument('--llavor', type=int, default=None,
+                        help="llavor global; els treballs sense 'llavor' en fan servir un flux fill")
+    parser.add_argument('--figures', default=None, help="directori on desar les figures (opcional)")
+    args = parser.parse_args()
+
+    resultats = executar_lots(llegir_treballs(args.treballs), args.processos, args.llavor)
+    desar_resultats(resultats, args.sortida)
+    print(f"{len(resultats)} treballs desats a {args.sortida}")
+    if args.figures:
+        renderitzar(resultats, args.figures)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+"""Instrumentació opcional dels camins calents dels simuladors.
+
+Està desactivada per defecte: una funció decorada amb @instrumentar només
+comprova un booleà abans de cridar l'original, i comptar() surt de seguida.
+Quan s'activa, cada crida registra el temps de paret, els comptadors que la
+funció hi hagi afegit (nombres aleatoris, iteracions del solucionador,
+trets...) i, si es demana, el pic de memòria amb tracemalloc.
+
+Activació des del codi:
+    import instrumentacio
+    instrumentacio.activar('crides.jsonl', memoria=True)
+    ...
+    instrumentacio.mostrar_resum()
+
+o amb la variable d'entorn INSTRUMENTACIO=1 (només resum en sortir) o
+INSTRUMENTACIO=crides.jsonl (a més, una línia JSON per crida).
+"""
+import atexit
+import functools
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+ACTIU = False
+
+_estadistiques = {}
+_pila = []
+_pics = []
+_log = None
+_memoria = False
+_tracemalloc_propi = False
+
+
+def activar(fitxer=None, memoria=False):
+    """Comença a registrar; fitxer és un JSON Lines opcional amb una línia per crida"""
+    global ACTIU, _log, _memoria, _tracemalloc_propi
+    desactivar()
+    if fitxer:
+        _log = open(fitxer, 'a', encoding='utf-8')
+    _memoria = memoria
+    # Només l'aturarem si l'hem engegat nosaltres
+    _tracemalloc_propi = memoria and not tracemalloc.is_tracing()
+    if _tracemalloc_propi:
+        tracemalloc.start()
+    ACTIU = True
+
+
+def desactivar():
+    global ACTIU, _log, _memoria, _tracemalloc_propi
+    ACTIU = False
+    if _log is not None:
+        _log.close()
+        _log = None
+    if _tracemalloc_propi:
+        tracemalloc.stop()
+        _tracemalloc_propi = False
+    _memoria = False
+
+
+def reiniciar():
+    """Esborra les estadístiques acumulades"""
+    _estadistiques.clear()
+
+
+def comptar(clau, n=1):
+    """Suma n al comptador clau de la crida instrumentada en curs"""
+    if ACTIU and _pila:
+        comptadors = _pila[-1]
+        comptadors[clau] = comptadors.get(clau, 0) + n
+
+
+def instrumentar(nom=None):
+    """Decorador: registra cada crida de la funció quan la instrumentació és activa"""
+    def decorador(funcio):
+        clau = nom or funcio.__qualname__
+
+        @functools.wraps(funcio)
+        def embolcall(*args, **kwargs):
+            if not ACTIU:
+                return funcio(*args, **kwargs)
+            return _cridar(clau, funcio, args, kwargs)
+        return embolcall
+    return decorador
+
+
+def _cridar(clau, funcio, args, kwargs):
+    comptadors = {}
+    _pila.append(comptadors)
+    memoria = _memoria and tracemalloc.is_tracing()
+    if memoria:
+        # reset_peak esborra el pic de la crida exterior: el guardem abans
+        actual, pic_fins_ara = tracemalloc.get_traced_memory()
+        if _pics:
+            _pics[-1] = max(_pics[-1], pic_fins_ara)
+        _pics.append(actual)
+        tracemalloc.reset_peak()
+        memoria_inicial = actual
+    inici = time.perf_counter()
+    try:
+        return funcio(*args, **kwargs)
+    finally:
+        temps = time.perf_counter() - inici
+        _pila.pop()
+        pic = None
+        if memoria:
+            pic_absolut = max(_pics.pop(), tracemalloc.get_traced_memory()[1])
+            if _pics:
+                _pics[-1] = max(_pics[-1], pic_absolut)
+            pic = pic_absolut - memoria_inicial
+        _registrar(clau, temps, comptadors, pic)
+
+
+def _registrar(clau, temps, comptadors, pic):
+    e = _estadistiques.setdefault(clau, {'crides': 0, 'temps': 0.0, 'temps_max': 0.0,
+                                         'memoria_pic': None, 'comptadors': {}})
+    e['crides'] += 1
+    e['temps'] += temps
+    e['temps_max'] = max(e['temps_max'], temps)
+    if pic is not None:
+        e['memoria_pic'] = max(e['memoria_pic'] or 0, pic)
+    for c, n in comptadors.items():
+        e['comptadors'][c] = e['comptadors'].get(c, 0) + n
+    if _log is not None:
+        registre = {'funcio': clau, 'inici': time.time() - temps, 'temps': temps, **comptadors}
+        if pic is not None:
+            registre['memoria_pic'] = pic
+        _log.write(json.dumps(registre) + '\n')
+        _log.flush()
+
+
+def resum():
+    """Estadístiques per funció: crides, temps total/mitjà/màxim, comptadors i ritmes per segon"""
+    files = []
+    for clau, e in _estadistiques.items():
+        fila = {'funcio': clau, 'crides': e['crides'], 'temps': e['temps'],
+                'temps_mitja': e['temps'] / e['crides'], 'temps_max': e['temps_max'],
+                'memoria_pic': e['memoria_pic']}
+        for c, n in e['comptadors'].items():
+            fila[c] = n
+            fila[f'{c}/crida'] = n / e['crides']
+            if e['temps'] > 0:
+                fila[f'{c}/s'] = n / e['temps']
+        files.append(fila)
+    return sorted(files, key=lambda f: f['temps'], reverse=True)
+
+
+def mostrar_resum(fitxer=sys.stderr):
+    """Taula de resum, de la funció que més temps ha consumit a la que menys"""
+    files = resum()
+    if not files:
+        return
+    print(f"{'funció':<36}{'crides':>8}{'total (s)':>12}{'mitjà (s)':>12}{'màx (s)':>12}{'memòria':>12}",
+          file=fitxer)
+    for fila in files:
+        memoria = f"{fila['memoria_pic'] / 2**20:.1f} MB" if fila['memoria_pic'] is not None else '-'
+        print(f"{fila['funcio']:<36}{fila['crides']:>8}{fila['temps']:>12.4g}"
+              f"{fila['temps_mitja']:>12.4g}{fila['temps_max']:>12.4g}{memoria:>12}", file=fitxer)
+        for c, n in _estadistiques[fila['funcio']]['comptadors'].items():
+            ritme = f", {fila[c + '/s']:.3g}/s" if c + '/s' in fila else ''
+            print(f"    {c}: {n} ({fila[c + '/crida']:.3g}/crida{ritme})", file=fitxer)
+
+
+_entorn = os.environ.get('INSTRUMENTACIO', '')
+if _entorn and _entorn != '0':
+    activar(None if _entorn == '1' else _entorn)
+    atexit.register(mostrar_resum)
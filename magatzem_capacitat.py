@@ -0,0 +1,257 @@
+"""Magatzem persistent dels mapes de capacitat del canal binari asimètric.
+
+La p òptima i C = I(p, eps_0, eps_1) es desen en fitxers .npy mapejats a
+memòria, un joc per resolució i tolerància del solucionador. Els punts de
+la malla són eps = k / divisions amb k enter, de manera que en ampliar el
+rang o canviar de resolució els punts que ja s'havien calculat (en aquesta
+malla o en una altra amb la mateixa tolerància) es reaprofiten i només es
+calculen les cel·les que falten.
+
+Els arrays tenen les files en eps_1 i les columnes en eps_0, com
+np.meshgrid(eps_0, eps_1).
+
+Quan la malla s'amplia, els arrays nous es desen amb noms que porten
+l'origen i la forma (p.<k0>_<j0>_<files>x<columnes>.npy) i meta.json passa
+a apuntar-hi. Així els arrays que mapa() havia retornat abans continuen
+mapant els fitxers antics, que no es reescriuen mai: els seus valors ja
+estaven calculats i segueixen sent vàlids. Els fitxers antics s'esborren
+quan ja no els mapa res (a Windows no es poden esborrar mentre estan
+oberts; es torna a provar a la següent ampliació).
+"""
+import json
+import os
+from math import gcd
+
+import numpy as np
+from numpy.lib.format import open_memmap
+
+from canal_binari import I, derI, bis_vectorial
+
+FITXERS = ('p', 'C', 'calculat')
+
+
+def _nom_malla(divisions, tol):
+    return f"d{divisions}_tol{tol!r}"
+
+
+def _nom_fitxer(nom, k0, j0, forma):
+    return f"{nom}.{k0}_{j0}_{forma[0]}x{forma[1]}.npy"
+
+
+class _Malla:
+    """Arrays d'una malla (divisions, tol): p, C i la màscara calculat"""
+
+    def __init__(self, cami, mode='r+'):
+        self.cami = cami
+        with open(os.path.join(cami, 'meta.json'), encoding='utf-8') as f:
+            meta = json.load(f)
+        self.divisions, self.tol = meta['divisions'], meta['tol']
+        self.k0, self.j0 = meta['k0'], meta['j0']
+        # Els magatzems antics no tenien la forma al nom del fitxer
+        self.fitxers = meta.get('fitxers', {nom: f'{nom}.npy' for nom in FITXERS})
+        for nom in FITXERS:
+            setattr(self, nom, np.load(os.path.join(cami, self.fitxers[nom]), mmap_mode=mode))
+
+    @property
+    def forma(self):
+        return self.p.shape
+
+    def tancar(self):
+        for nom in FITXERS:
+            array = getattr(self, nom)
+            if array.flags.writeable:
+                array.flush()
+            setattr(self, nom, None)
+
+
+class MagatzemCapacitat:
+    """Mapes de p òptima i capacitat sobre la malla eps = k / divisions.
+
+    magatzem = MagatzemCapacitat('mapes_capacitat')
+    eps_0, eps_1, p, C = magatzem.mapa(0.0025, 0.5, 0.0025, 0.5)
+
+    p i C són vistes de només lectura dels fitxers: no es carreguen a
+    memòria fins que es llegeixen.
+    """
+
+    def __init__(self, directori, divisions=400, tol=1e-10, mida_bloc=2**18):
+        self.directori = directori
+        self.divisions = int(divisions)
+        self.tol = float(tol)
+        self.mida_bloc = mida_bloc
+        self.cami = os.path.join(directori, _nom_malla(self.divisions, self.tol))
+        os.makedirs(directori, exist_ok=True)
+        self.malla = _Malla(self.cami) if os.path.exists(os.path.join(self.cami, 'meta.json')) else None
+        if self.malla is not None:
+            self._esborrar_antics()
+
+    def _indexs(self, eps_min, eps_max):
+        """Primer i últim k (inclosos) amb eps_min <= k / divisions <= eps_max"""
+        if not 0.0 <= eps_min <= eps_max <= 1.0:
+            raise ValueError(f"Rang no vàlid: [{eps_min}, {eps_max}]")
+        k_min = int(np.ceil(eps_min * self.divisions - 1e-9))
+        k_max = int(np.floor(eps_max * self.divisions + 1e-9))
+        if k_min > k_max:
+            raise ValueError(f"Cap punt de la malla 1/{self.divisions} dins de [{eps_min}, {eps_max}]")
+        return k_min, k_max
+
+    def _ampliar(self, k_min, k_max, j_min, j_max):
+        """Fa que la malla cobreixi aquestes columnes (eps_0) i files (eps_1)"""
+        m = self.malla
+        if m is not None:
+            n_j, n_k = m.forma
+            if m.k0 <= k_min and k_max < m.k0 + n_k and m.j0 <= j_min and j_max < m.j0 + n_j:
+                return
+            k_min, k_max = min(k_min, m.k0), max(k_max, m.k0 + n_k - 1)
+            j_min, j_max = min(j_min, m.j0), max(j_max, m.j0 + n_j - 1)
+
+        # Fitxers nous (al disc són dispersos fins que s'hi escriu) i còpia de l'antic per blocs de files
+        os.makedirs(self.cami, exist_ok=True)
+        forma = (j_max - j_min + 1, k_max - k_min + 1)
+        fitxers = {nom: _nom_fitxer(nom, k_min, j_min, forma) for nom in FITXERS}
+        nous = {nom: open_memmap(os.path.join(self.cami, fitxers[nom]), mode='w+',
+                                 dtype=np.uint8 if nom == 'calculat' else np.float64, shape=forma)
+                for nom in FITXERS}
+        if m is not None:
+            n_j, n_k = m.forma
+            dj, dk = m.j0 - j_min, m.k0 - k_min
+            files_bloc = max(1, self.mida_bloc // n_k)
+            for inici in range(0, n_j, files_bloc):
+                fi = min(inici + files_bloc, n_j)
+                for nom in FITXERS:
+                    nous[nom][dj + inici:dj + fi, dk:dk + n_k] = getattr(m, nom)[inici:fi]
+            m.tancar()
+        for array in nous.values():
+            array.flush()
+        del nous
+        # meta.json (que no es mapa mai) passa a apuntar als fitxers nous d'un sol cop
+        meta = os.path.join(self.cami, 'meta.json')
+        with open(meta + '.nou', 'w', encoding='utf-8') as f:
+            json.dump({'divisions': self.divisions, 'tol': self.tol, 'k0': k_min, 'j0': j_min,
+                       'fitxers': fitxers}, f)
+        os.replace(meta + '.nou', meta)
+        self.malla = _Malla(self.cami)
+        self._esborrar_antics()
+
+    def _esborrar_antics(self):
+        """Esborra els .npy de la malla als quals meta.json ja no apunta.
+
+        A POSIX es poden esborrar encara que algun array els mapi (les dades
+        es mantenen fins que es tanca); a Windows l'esborrat falla mentre
+        estan mapats i es deixen per a més endavant.
+        """
+        actuals = set(self.malla.fitxers.values())
+        for nom in os.listdir(self.cami):
+            if nom.endswith('.npy') and nom not in actuals:
+                try:
+                    os.remove(os.path.join(self.cami, nom))
+                except OSError:
+                    pass
+
+    def _altres_malles(self):
+        """Malles desades amb la mateixa tolerància i una altra resolució"""
+        for nom in sorted(os.listdir(self.directori)):
+            cami = os.path.join(self.directori, nom)
+            if cami == self.cami or not os.path.exists(os.path.join(cami, 'meta.json')):
+                continue
+            altra = _Malla(cami, mode='r')
+            if altra.tol == self.tol:
+                yield altra
+
+    def _importar(self, altra, k_min, k_max, j_min, j_max):
+        """Copia de altra els punts comuns de la regió que aquí encara no estan calculats.
+
+        Els punts comuns de les malles 1/d i 1/d' són els múltiples de 1/gcd(d, d').
+        """
+        m = self.malla
+        g = gcd(self.divisions, altra.divisions)
+        s, s_altra = self.divisions // g, altra.divisions // g
+        n_j, n_k = altra.forma
+
+        def rang_t(inici, fi, inici_altra, fi_altra):
+            t0 = max(-(-inici // s), -(-inici_altra // s_altra))
+            t1 = min(fi // s, fi_altra // s_altra)
+            return t0, t1
+
+        tk0, tk1 = rang_t(k_min, k_max, altra.k0, altra.k0 + n_k - 1)
+        tj0, tj1 = rang_t(j_min, j_max, altra.j0, altra.j0 + n_j - 1)
+        if tk0 > tk1 or tj0 > tj1:
+            return
+        aqui_k = slice(tk0 * s - m.k0, tk1 * s - m.k0 + 1, s)
+        alla_k = slice(tk0 * s_altra - altra.k0, tk1 * s_altra - altra.k0 + 1, s_altra)
+        files_bloc = max(1, self.mida_bloc // (tk1 - tk0 + 1))
+        for t in range(tj0, tj1 + 1, files_bloc):
+            t_fi = min(t + files_bloc, tj1 + 1)
+            aqui_j = slice(t * s - m.j0, (t_fi - 1) * s - m.j0 + 1, s)
+            alla_j = slice(t * s_altra - altra.j0, (t_fi - 1) * s_altra - altra.j0 + 1, s_altra)
+            copiar = (altra.calculat[alla_j, alla_k] == 1) & (m.calculat[aqui_j, aqui_k] == 0)
+            if copiar.any():
+                # Amb llesques bàsiques, m.p[aqui_j, aqui_k] és una vista del fitxer
+                for nom in ('p', 'C'):
+                    getattr(m, nom)[aqui_j, aqui_k][copiar] = getattr(altra, nom)[alla_j, alla_k][copiar]
+                m.calculat[aqui_j, aqui_k] |= copiar.astype(np.uint8)
+
+    def _omplir(self, k_min, k_max, j_min, j_max):
+        """Calcula les cel·les de la regió que encara falten"""
+        m = self.malla
+        columnes = slice(k_min - m.k0, k_max - m.k0 + 1)
+        n_k = k_max - k_min + 1
+        files_bloc = max(1, self.mida_bloc // n_k)
+        if not m.calculat[j_min - m.j0:j_max - m.j0 + 1, columnes].all():
+            for altra in self._altres_malles():
+                self._importar(altra, k_min, k_max, j_min, j_max)
+                altra.tancar()
+
+        for j in range(j_min, j_max + 1, files_bloc):
+            files = slice(j - m.j0, min(j + files_bloc, j_max + 1) - m.j0)
+            falten = m.calculat[files, columnes] == 0
+            if not falten.any():
+                continue
+            jj, kk = np.nonzero(falten)
+            eps_1 = (jj + j) / self.divisions
+            eps_0 = (kk + k_min) / self.divisions
+            p = bis_vectorial(0.0, 1.0, derI, eps_0, eps_1, tol=self.tol)
+            m.p[files, columnes][jj, kk] = p
+            m.C[files, columnes][jj, kk] = I(p, eps_0, eps_1)
+            m.calculat[files, columnes] = 1
+        for nom in FITXERS:
+            getattr(m, nom).flush()
+
+    def mapa(self, eps0_min, eps0_max, eps1_min, eps1_max):
+        """(eps_0, eps_1, p, C) per als punts de la malla dins dels rangs.
+
+        eps_0 i eps_1 són els valors dels eixos; p i C tenen forma
+        (len(eps_1), len(eps_0)) i són vistes de només lectura del disc.
+        """
+        k_min, k_max = self._indexs(eps0_min, eps0_max)
+        j_min, j_max = self._indexs(eps1_min, eps1_max)
+        self._ampliar(k_min, k_max, j_min, j_max)
+        self._omplir(k_min, k_max, j_min, j_max)
+        m = self.malla
+        regio = (slice(j_min - m.j0, j_max - m.j0 + 1), slice(k_min - m.k0, k_max - m.k0 + 1))
+        p, C = m.p[regio], m.C[regio]
+        p.flags.writeable = False
+        C.flags.writeable = False
+        return (np.arange(k_min, k_max + 1) / self.divisions,
+                np.arange(j_min, j_max + 1) / self.divisions, p, C)
+
+    def consultar(self, eps_0, eps_1):
+        """(p, C) al punt de la malla més proper a cada (eps_0, eps_1)"""
+        eps_0, eps_1 = np.broadcast_arrays(np.asarray(eps_0, dtype=float), np.asarray(eps_1, dtype=float))
+        k = np.rint(eps_0 * self.divisions).astype(np.int64)
+        j = np.rint(eps_1 * self.divisions).astype(np.int64)
+        if k.size == 0:
+            return np.empty(k.shape), np.empty(k.shape)
+        if k.min() < 0 or j.min() < 0 or k.max() > self.divisions or j.max() > self.divisions:
+            raise ValueError("eps_0 i eps_1 han d'estar entre 0 i 1")
+        self._ampliar(int(k.min()), int(k.max()), int(j.min()), int(j.max()))
+        m = self.malla
+        jj, kk = j.ravel() - m.j0, k.ravel() - m.k0
+        falten = m.calculat[jj, kk] == 0
+        if falten.any():
+            e0, e1 = k.ravel()[falten] / self.divisions, j.ravel()[falten] / self.divisions
+            p = bis_vectorial(0.0, 1.0, derI, e0, e1, tol=self.tol)
+            m.p[jj[falten], kk[falten]] = p
+            m.C[jj[falten], kk[falten]] = I(p, e0, e1)
+            m.calculat[jj[falten], kk[falten]] = 1
+        return m.p[jj, kk].reshape(k.shape), m.C[jj, kk].reshape(k.shape)
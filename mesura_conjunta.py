@@ -0,0 +1,105 @@
+"""Mesura conjunta de dos qubits: el primer en la base z i el segon en una
+base rotada un angle alpha. Probabilitats teòriques (amb memòria cau per
+estat i angle) i simulació de n trets.
+"""
+from collections import namedtuple
+from functools import lru_cache
+
+import numpy as np
+
+from estat_qubits import EstatQubits
+from instrumentacio import comptar, instrumentar
+
+def normalizar_estado(estado):
+    """Normalitza l'estat quàntic"""
+    return EstatQubits(estado).normalitzar().amplituds
+
+def probabilidad_medida(estado, base):
+    """Calcula la probabilitat de cada resultat de mesura en una base donada"""
+    qubits = EstatQubits(estado)
+    if base == 'z':
+        # Mesura en base z del primer qubit: |0⟩ i |1⟩
+        p0, p1 = qubits.probabilitats([0])
+        return p0, p1
+    else:
+        # Mesura del segon qubit en base rotada (angle alpha)
+        p_plus, p_minus = qubits.rotar_base(1, base).probabilitats([1])
+        return p_plus, p_minus
+
+@instrumentar('simular_medida_quantica')
+def simular_medida_quantica(estado, alpha, n_simulaciones, rng=None):
+    """Simula n mesures quàntiques de l'estat"""
+    comptar('trets', n_simulaciones)
+    comptar('mostres_aleatories', 1)
+    rng = np.random.default_rng(rng)
+    # La distribució conjunta (A, B) és fixa per a un estat i un angle:
+    # P(A=±) * P(B=±|A=±) = |<±z, ±alpha|estat>|^2. Tots els trets surten
+    # d'una sola mostra multinomial.
+    probs = np.array(calcular_probabilidades_teoricas(estado, alpha), dtype=float)
+    n_pp, n_pm, n_mp, n_mm = (int(n) for n in rng.multinomial(n_simulaciones, probs / probs.sum()))
+    resultados = {'++': n_pp, '+-': n_pm, '-+': n_mp, '--': n_mm}
+
+    # Calculem valors promig a partir dels comptes
+    total = n_simulaciones
+    A_avg = (n_pp + n_pm - n_mp - n_mm) / total
+    B_avg = (n_pp - n_pm + n_mp - n_mm) / total
+    sum_avg = A_avg + B_avg
+    prod_avg = (n_pp - n_pm - n_mp + n_mm) / total
+
+    # Calculem percentatges
+    percentatges = {
+        '%++': resultados['++'] / total * 100,
+        '%+-': resultados['+-'] / total * 100,
+        '%-+': resultados['-+'] / total * 100,
+        '%--': resultados['--'] / total * 100
+    }
+
+    return resultados, percentatges, A_avg, B_avg, sum_avg, prod_avg
+
+# --- Memòria cau de probabilitats i valors esperats per (estat, alpha) ---
+
+PaquetMesura = namedtuple('PaquetMesura', ['probs', 'E_A', 'E_B', 'E_prod'])
+
+def clau_estat(estado, alpha, decimals=12):
+    """Clau hashable canònica d'un estat i un angle.
+
+    Normalitza l'estat, treu la fase global (l'amplitud més gran passa a ser
+    real i positiva) i arrodoneix; alpha es pren mòdul 2π, ja que les
+    probabilitats no canvien si alpha augmenta 2π.
+    """
+    estado = normalizar_estado(estado)
+    gran = estado[np.argmax(np.round(np.abs(estado), decimals))]
+    estado = estado * (np.conj(gran) / np.abs(gran))
+    parts = np.round(np.concatenate([estado.real, estado.imag]), decimals) + 0.0
+    alpha = round(float(alpha) % (2 * np.pi), decimals) % round(2 * np.pi, decimals)
+    return tuple(parts.tolist()), alpha
+
+@lru_cache(maxsize=4096)
+def _paquet_teoric(clau):
+    parts, alpha = clau
+    estado = np.array(parts[:4]) + 1j * np.array(parts[4:])
+    qubits = EstatQubits(estado).normalitzar().rotar_base(1, alpha)
+    probs = tuple(float(p) for p in qubits.probabilitats([0, 1]))
+    return PaquetMesura(probs, qubits.correlacio([0]), qubits.correlacio([1]),
+                        qubits.correlacio([0, 1]))
+
+def paquet_teoric(estado, alpha):
+    """Probabilitats conjuntes i valors esperats, calculats un sol cop per (estat, alpha)"""
+    return _paquet_teoric(clau_estat(estado, alpha))
+
+def info_cache():
+    """Encerts, errades i mida de la memòria cau de paquet_teoric"""
+    return _paquet_teoric.cache_info()
+
+def buidar_cache():
+    """Buida la memòria cau de paquet_teoric"""
+    _paquet_teoric.cache_clear()
+
+def calcular_probabilidades_teoricas(estado, alpha):
+    """Calcula les probabilitats teòriques"""
+    return list(paquet_teoric(estado, alpha).probs)
+
+def calcular_valors_esperats_teorics(estado, alpha):
+    """Calcula els valors esperats teòrics"""
+    paquet = paquet_teoric(estado, alpha)
+    return paquet.E_A, paquet.E_B, paquet.E_prod
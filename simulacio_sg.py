@@ -0,0 +1,27 @@
+"""Mesura de σ_z en un aparell de Stern-Gerlach: simulació i valors teòrics."""
+import numpy as np
+
+
+def simular_stern_gerlach(prob_up, n_sims, rng=None, mida_lot=2**62):
+    """Fa n mesures de σ_z; retorna (mitjana, desviació, comptes ↑, comptes ↓)"""
+    rng = np.random.default_rng(rng)
+    # Només cal saber quantes mesures donen +1: és Binomial(n, P(up)). Per a
+    # n enormes se sumen binomials per blocs; la memòria no depèn de n.
+    count_up = 0
+    pendents = n_sims
+    while pendents > 0:
+        n = min(pendents, mida_lot)
+        count_up += int(rng.binomial(n, prob_up))
+        pendents -= n
+    count_down = n_sims - count_up
+
+    # Amb resultats ±1: mitjana = (N↑ - N↓)/n i variància = 1 - mitjana²
+    sim_mean = (count_up - count_down) / n_sims
+    sim_std = np.sqrt(max(0.0, 1 - sim_mean**2))
+    return sim_mean, sim_std, count_up, count_down
+
+
+def valors_teorics(prob_up):
+    """⟨σ_z⟩ i Δσ_z teòrics per a P(up) donada"""
+    exp_val = 2 * prob_up - 1
+    return exp_val, np.sqrt(max(0.0, 1 - exp_val**2))